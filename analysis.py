@@ -0,0 +1,108 @@
+import threading
+import weakref
+
+import numpy as np
+from scipy.stats import linregress
+
+from graph import Graph
+
+
+# Charts of graphs with more distinct degrees than this get log-binned / downsampled data
+CHART_MAX_POINTS = 200
+
+
+def degree_distribution(graph: Graph) -> dict:
+    return _degree_distribution(np.asarray(graph.get_degrees(), dtype=np.int64))
+
+
+def _degree_distribution(degrees: np.ndarray) -> dict:
+    nonzero_degrees = degrees[degrees > 0]
+
+    degree_counts = np.bincount(nonzero_degrees)
+    degree_counts_map = {degree: int(count) for degree, count in enumerate(degree_counts) if degree > 0 and count > 0}
+
+    nonzero_indices = degree_counts > 0
+    k = np.arange(len(degree_counts))[nonzero_indices]
+    degree_counts = degree_counts[nonzero_indices]
+    cdf = np.cumsum(degree_counts[::-1])[::-1] / sum(degree_counts)
+
+    # The fit needs at least two distinct degrees
+    if len(k) >= 2:
+        fit = linregress(np.log(k), np.log(cdf))
+        slope, intercept, rvalue, pvalue, stderr = fit.slope, fit.intercept, fit.rvalue, fit.pvalue, fit.stderr
+    else:
+        slope, intercept, rvalue, pvalue, stderr = np.nan, np.nan, np.nan, np.nan, np.nan
+
+    return {
+        'degree_counts': degree_counts_map,
+        'k': k,
+        'k_counts': degree_counts,
+        'cdf': cdf,
+        'slope': slope,
+        'intercept': intercept,
+        'r_squared': rvalue ** 2,
+        'p_value': pvalue,
+        'stderr': stderr,
+        'exponent': -slope + 1
+    }
+
+
+class DegreeAnalytics:
+    # Everything the analysis tab shows about one graph, computed once from its degree array
+    def __init__(self, graph: Graph, max_points: int = CHART_MAX_POINTS) -> None:
+        degrees = np.asarray(graph.get_degrees(), dtype=np.int64)
+        distribution = _degree_distribution(degrees)
+
+        self.vertices_number = len(degrees)
+        self.edges_number = graph.get_edges_number()
+        self.degree_counts = distribution['degree_counts']
+        self.k = distribution['k']
+        self.cdf = distribution['cdf']
+        self.slope = distribution['slope']
+        self.intercept = distribution['intercept']
+        self.r_squared = distribution['r_squared']
+        self.p_value = distribution['p_value']
+        self.stderr = distribution['stderr']
+        self.exponent = distribution['exponent']
+
+        self.histogram_x, self.histogram_y, self.histogram_binned = _histogram_chart(self.k, distribution['k_counts'], max_points)
+        self.cdf_x, self.cdf_y = _downsample_log(self.k, self.cdf, max_points)
+        self.fit_y = np.exp(self.intercept) * self.cdf_x.astype(np.float64) ** self.slope
+
+
+def _histogram_chart(k: np.ndarray, counts: np.ndarray, max_points: int) -> tuple[np.ndarray, np.ndarray, bool]:
+    if len(k) <= max_points:
+        return k, counts, False
+
+    # Logarithmic bins over the degree range, each bar labelled with its lowest degree
+    edges = np.unique(np.geomspace(k[0], k[-1] + 1, max_points + 1).astype(np.int64))
+    bins = np.searchsorted(edges, k, side='right') - 1
+    sums = np.bincount(bins, weights=counts, minlength=len(edges)).astype(np.int64)
+    used = sums > 0
+    return edges[used], sums[used], True
+
+
+def _downsample_log(x: np.ndarray, y: np.ndarray, max_points: int) -> tuple[np.ndarray, np.ndarray]:
+    if len(x) <= max_points:
+        return x, y
+
+    # Points evenly spaced on the log axis, always keeping both ends
+    targets = np.geomspace(x[0], x[-1], max_points)
+    indices = np.unique(np.clip(np.searchsorted(x, targets), 0, len(x) - 1))
+    return x[indices], y[indices]
+
+
+# Analytics of graphs with the revision they were computed at, dropped together with the graph
+_analytics = weakref.WeakKeyDictionary()
+_analytics_lock = threading.Lock()
+
+
+def degree_analytics(graph: Graph) -> DegreeAnalytics:
+    with _analytics_lock:
+        revision, analytics = _analytics.get(graph, (None, None))
+    if revision != graph.get_revision():
+        revision = graph.get_revision()
+        analytics = DegreeAnalytics(graph)
+        with _analytics_lock:
+            _analytics[graph] = revision, analytics
+    return analytics
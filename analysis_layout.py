@@ -1,84 +1,88 @@
 import streamlit as st
-import numpy as np
 import plotly.graph_objects as go
-from scipy.stats import linregress
 
+from analysis import degree_analytics
 from pcb_board import PcbBoard
+from search import PAGE_SIZE, SearchIndex, board_indexes
 
 
 def analysis_layout(board: PcbBoard, st: st) -> None:
     st.subheader("PCB Analysis")
 
+    components_index, nets_index = board_indexes(board)
+
     col1, col2 = st.columns(2)
     with col1:
-        pads = sorted(board.get_aggregated_pads().items(), key=lambda item: item[0])
         with st.expander("Components & Pads"):
-            search_query = st.text_input("Search for a component:", "").lower()
-            for key, value in [pad for pad in pads if search_query in pad[0].lower()]:
-                st.write(f"**{key.capitalize()}**: {value}")
+            search_layout(components_index, "component", st)
     with col2:
-        nets = sorted(board.get_connections().items(), key=lambda item: item[0])
         with st.expander("Nets"):
-            search_query = st.text_input("Search for a net:", "").lower()
-            for key, value in [net for net in nets if search_query in net[0].lower()]:
-                st.write(f"**{key.capitalize()}**: {value}")
+            search_layout(nets_index, "net", st)
 
     st.divider()
 
+    components_analytics = degree_analytics(board.get_components_graph())
+    pads_analytics = degree_analytics(board.get_pads_graph())
+
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("Components Graph")
-        st.write(f"Nodes: {board.get_components_graph().get_vertices_number()}")
-        st.write(f"Edges: {board.get_components_graph().get_edges_number()}")
+        st.write(f"Nodes: {components_analytics.vertices_number}")
+        st.write(f"Edges: {components_analytics.edges_number}")
 
     with col2:
         st.subheader("Pads Graph")
-        st.write(f"Nodes: {board.get_pads_graph().get_vertices_number()}")
-        st.write(f"Edges: {board.get_pads_graph().get_edges_number()}")
-
-    for graph, col in [(board.get_components_graph(), col1), (board.get_pads_graph(), col2)]:
-        nonzero_degrees = [degree for degree in graph.get_degrees() if degree > 0]
-
-        degree_counts = np.bincount(nonzero_degrees)
-        degree_counts_map = {degree: count for degree, count in enumerate(degree_counts) if degree > 0}
-
-        nonzero_indices = degree_counts > 0
-        k = np.arange(len(degree_counts))[nonzero_indices]
-        degree_counts = degree_counts[nonzero_indices]
-        cdf = np.cumsum(degree_counts[::-1])[::-1] / sum(degree_counts)
-
-        log_k = np.log(k)
-        log_cdf = np.log(cdf)
-        slope, intercept, _, _, _ = linregress(log_k, log_cdf)
-        lambda_estimate = -slope
+        st.write(f"Nodes: {pads_analytics.vertices_number}")
+        st.write(f"Edges: {pads_analytics.edges_number}")
 
+    for analytics, col in [(components_analytics, col1), (pads_analytics, col2)]:
         with col:
-            st.write(f"Estimated Power-Law Exponent: {lambda_estimate+1:.2f}")
+            st.write(f"Estimated Power-Law Exponent: {analytics.exponent:.2f} (R² = {analytics.r_squared:.3f}, stderr = {analytics.stderr:.3f})")
 
             fig = go.Figure()
-            fig.add_trace(go.Bar(x=list(degree_counts_map.keys()), y=list(degree_counts_map.values())))
+            fig.add_trace(go.Bar(x=analytics.histogram_x, y=analytics.histogram_y))
+            if analytics.histogram_binned:
+                fig.update_xaxes(type='log')
             fig.update_layout(title='Degree Histogram', xaxis_title='Degree', yaxis_title='Frequency', title_x=0.5, title_y=0.8)
             st.plotly_chart(fig)
 
             fig = go.Figure()
             fig.add_trace(go.Scatter
             (
-                x=k,
-                y=cdf,
+                x=analytics.cdf_x,
+                y=analytics.cdf_y,
                 mode='markers',
                 name='Degree CDF',
                 marker=dict(color='deepskyblue')
             ))
             fig.add_trace(go.Scatter
             (
-                x=k,
-                y=np.exp(intercept) * k ** slope,
+                x=analytics.cdf_x,
+                y=analytics.fit_y,
                 mode='lines',
-                name=f'Power-law fit: {lambda_estimate+1:.2f}',
+                name=f'Power-law fit: {analytics.exponent:.2f}',
                 line=dict(color='deeppink')
             ))
             fig.update_xaxes(type='log')
             fig.update_yaxes(type='log')
             fig.update_layout(title='Degree CDF', xaxis_title='Degree', yaxis_title='CDF', title_x=0.5, title_y=0.8)
             fig.update_layout(legend=dict(xanchor="center", yanchor="top", x=0.5, y=-0.2))
-            st.plotly_chart(fig)
\ No newline at end of file
+            st.plotly_chart(fig)
+
+def search_layout(index: SearchIndex, entry: str, st: st) -> None:
+    search_col, mode_col = st.columns([3, 1])
+    with search_col:
+        search_query = st.text_input(f"Search for a {entry} or pad:", "", key=f"{entry}_search")
+    with mode_col:
+        prefix = st.toggle("Prefix", key=f"{entry}_prefix")
+
+    matches = index.search(search_query, prefix)
+    pages_number = max(1, -(-len(matches) // PAGE_SIZE))
+    page = st.number_input(f"Page (of {pages_number}):", min_value=1, max_value=pages_number, value=1, key=f"{entry}_page")
+
+    st.caption(f"{len(matches)} of {len(index)} matching")
+    st.dataframe(
+        [{entry.capitalize(): name, "Pads": ", ".join(values)} for name, values in index.page(matches, page - 1)],
+        hide_index=True,
+        use_container_width=True
+    )
@@ -1,8 +1,19 @@
 import streamlit as st
+import logging
+import os
 
+import native
+import profiling
 from analysis_layout import analysis_layout
 from builder_layout import builder_layout
 from input_layout import input_layout
+from performance_layout import performance_layout
+
+logging.basicConfig(level=os.environ.get("LINKBOARD_LOG_LEVEL", "WARNING"))
+
+# OGDF (and pcbnew) are otherwise loaded on first use, e.g. when the layout builder opens
+if os.environ.get("LINKBOARD_WARM_UP", "0") == "1":
+    native.start_warm_up()
 
 def main():
     st.set_page_config(
@@ -16,6 +27,20 @@ def main():
     for _ in range(3):
         st.write("")
 
+    show_performance = st.sidebar.toggle("Performance panel")
+    profile_run = st.sidebar.checkbox("Profile this run (cProfile + tracemalloc)")
+
+    with profiling.collect() as recorder, profiling.capture(enabled=profile_run) as profile:
+        render(st)
+
+    if show_performance:
+        for _ in range(3):
+            st.write("")
+
+        performance_layout(recorder, profile, st, st.session_state.get("builder_job"))
+
+
+def render(st: st) -> None:
     board = input_layout(st)
 
     if board is not None:
@@ -0,0 +1,193 @@
+import argparse
+import collections
+import csv
+import glob
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from analysis import degree_distribution
+from legalization import legalize
+from pcb_board import NET_MODELS, READERS, PcbBoard
+from planarity import Planarity
+
+
+def collect_boards(paths: list) -> list:
+    boards = []
+    for path in paths:
+        if os.path.isdir(path):
+            boards += sorted(glob.glob(os.path.join(path, "**", "*.kicad_pcb"), recursive=True))
+        else:
+            boards.append(path)
+    return boards
+
+
+def output_names(boards: list) -> list:
+    # Outputs are named after the board file, boards sharing a name (e.g. from different directories) also get
+    # a short hash of their full path so they do not overwrite each other
+    stems = [os.path.splitext(os.path.basename(filename))[0] for filename in boards]
+    counts = collections.Counter(stems)
+    return [stem if counts[stem] == 1 else f"{stem}-{hashlib.sha1(os.path.abspath(filename).encode()).hexdigest()[:8]}"
+            for stem, filename in zip(stems, boards)]
+
+
+def finite_or_none(value: float) -> float:
+    # NaN (e.g. the exponent of a board with fewer than two distinct degrees) is not valid JSON
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def write_metrics(metrics: dict, output_dir: str) -> None:
+    with open(os.path.join(output_dir, f"{metrics['output']}.json"), "w") as file:
+        json.dump(metrics, file, indent=2)
+
+
+def failed_metrics(filename: str, name: str, output_dir: str, net_model: str, error: str) -> dict:
+    # Metrics of a board whose worker failed outside process_board, e.g. because the process died
+    metrics = {'board': filename, 'output': name, 'status': 'error', 'net_model': net_model, 'error': error, 'timings': {}}
+    write_metrics(metrics, output_dir)
+    return metrics
+
+
+def process_board(filename: str, name: str, output_dir: str, separation: float, layout: bool, net_model: str, reader: str = "sexpr") -> dict:
+    metrics = {'board': filename, 'output': name, 'status': 'ok', 'net_model': net_model}
+    timings = {}
+
+    try:
+        start = time.perf_counter()
+        board = PcbBoard(os.path.basename(filename), net_model)
+        board.load_from_file(filename, reader)
+        timings['load'] = time.perf_counter() - start
+
+        components_graph = board.get_components_graph()
+        pads_graph = board.get_pads_graph()
+        metrics['components'] = components_graph.get_vertices_number()
+        metrics['components_edges'] = components_graph.get_edges_number()
+        metrics['pads'] = pads_graph.get_vertices_number()
+        metrics['pads_edges'] = pads_graph.get_edges_number()
+        metrics['nets'] = len(board.get_connections())
+
+        start = time.perf_counter()
+        metrics['components_exponent'] = finite_or_none(degree_distribution(components_graph)['exponent'])
+        metrics['pads_exponent'] = finite_or_none(degree_distribution(pads_graph)['exponent'])
+        timings['analysis'] = time.perf_counter() - start
+
+        # Boards are already spread over worker processes, so planarity runs serially in each of them
+        start = time.perf_counter()
+        planar_subgraphs = Planarity.max_planar_subgraphs(components_graph, workers=1)
+        metrics['thickness'] = len(planar_subgraphs)
+        timings['decomposition'] = time.perf_counter() - start
+
+        if layout and len(planar_subgraphs) > 0:
+            start = time.perf_counter()
+            dimensions = board.get_component_dimensions()
+            placement, _ = Planarity.find_layout_of_planar_graph(planar_subgraphs[Planarity.placement_layer(planar_subgraphs)], dimensions, separation)
+            embedding, legalization = legalize(placement, dimensions)
+            board.update_component_positions(embedding)
+            metrics['overlaps'] = legalization['overlaps']
+            metrics['displacement'] = legalization['displacement']
+            timings['layout'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            board.save_to_file(os.path.join(output_dir, f"updated-{name}.kicad_pcb"))
+            # Every layer is drawn at the positions written to the board
+            for index, subgraph in enumerate(planar_subgraphs):
+                with open(os.path.join(output_dir, f"{name}-layer-{index + 1}.svg"), "wb") as file:
+                    file.write(Planarity.draw_at_placement(subgraph, dimensions, embedding))
+            timings['save'] = time.perf_counter() - start
+    except Exception as e:
+        metrics['status'] = 'error'
+        metrics['error'] = f"{type(e).__name__}: {e}"
+
+    metrics['timings'] = timings
+    write_metrics(metrics, output_dir)
+
+    return metrics
+
+
+def run_pool(tasks: list, workers: int, report) -> list:
+    # Calls report with the metrics of every board processed, returns the tasks lost because a worker died
+    lost = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [(task, executor.submit(process_board, *task)) for task in tasks]
+        for task, future in futures:
+            try:
+                report(future.result())
+            except BrokenProcessPool:
+                lost.append(task)
+            except Exception as e:
+                report(failed_metrics(task[0], task[1], task[2], task[5], f"{type(e).__name__}: {e}"))
+    return lost
+
+
+def write_summary(results: list, filename: str) -> None:
+    rows = []
+    for metrics in results:
+        row = {key: value for key, value in metrics.items() if key != 'timings'}
+        row.update({f"time_{stage}": value for stage, value in metrics['timings'].items()})
+        rows.append(row)
+
+    columns = []
+    for row in rows:
+        columns += [column for column in row if column not in columns]
+
+    with open(filename, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Analyze and lay out KiCad boards without the Streamlit UI.")
+    parser.add_argument("boards", nargs="+", help="*.kicad_pcb files or directories searched recursively")
+    parser.add_argument("-o", "--output", default="output", help="directory for metrics, SVG drawings and updated boards")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(), help="number of boards processed in parallel")
+    parser.add_argument("--separation", type=float, default=10.0, help="separation passed to the orthogonal layout")
+    parser.add_argument("--net-model", choices=NET_MODELS, default="chain", help="how the pads of a net are linked")
+    parser.add_argument("--reader", choices=READERS, default="sexpr", help="read boards with the streaming parser or with pcbnew")
+    parser.add_argument("--no-layout", action="store_true", help="only compute metrics, skip layout and board export")
+    args = parser.parse_args(argv)
+
+    boards = collect_boards(args.boards)
+    if len(boards) == 0:
+        print("No boards found.", file=sys.stderr)
+        return 1
+
+    os.makedirs(args.output, exist_ok=True)
+
+    start = time.perf_counter()
+    results = []
+
+    def report(metrics: dict) -> None:
+        results.append(metrics)
+        print(f"[{len(results)}/{len(boards)}] {metrics['board']}: {metrics['status']}", flush=True)
+
+    tasks = [(board, name, args.output, args.separation, not args.no_layout, args.net_model, args.reader)
+             for board, name in zip(boards, output_names(boards))]
+    lost = run_pool(tasks, args.workers, report)
+
+    # A worker that dies (a crash in OGDF, an OOM kill) takes every board still queued in the pool with it. Those
+    # are retried one at a time, so the first one lost again is the one that crashed.
+    while len(lost) > 0:
+        lost = run_pool(lost, 1, report)
+        if len(lost) > 0:
+            report(failed_metrics(lost[0][0], lost[0][1], args.output, args.net_model, "the worker process died"))
+            lost = lost[1:]
+    elapsed = time.perf_counter() - start
+
+    write_summary(results, os.path.join(args.output, "summary.csv"))
+
+    failed = sum(1 for metrics in results if metrics['status'] != 'ok')
+    print(f"Processed {len(results)} boards ({failed} failed) in {elapsed:.1f} s, {60 * len(results) / elapsed:.1f} boards/min")
+
+    return 0 if failed == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
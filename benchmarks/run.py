@@ -0,0 +1,221 @@
+import argparse
+import copy
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import generate_board, install_pcbnew_stand_in, register_board, write_kicad_pcb
+
+install_pcbnew_stand_in()
+
+import graph
+import planarity
+from analysis import DegreeAnalytics
+from graph import CompactGraph, Graph
+from legalization import legalize
+from pcb_board import PcbBoard
+from planarity import Planarity
+
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# footprints, pads per footprint, net size distribution, whether the planarity stages run at this scale
+SCALES = {
+    'small': (200, 4, "powerlaw", True),
+    'medium': (1000, 6, "powerlaw", True),
+    'large': (4000, 8, "powerlaw", False),
+    'huge': (20000, 6, "uniform", False),
+}
+
+# Stages faster than this are dominated by noise and never reported as regressions
+MIN_REPORTED_SECONDS = 0.02
+
+
+def measure(function, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def convert_with_model(board: PcbBoard, net_model: str) -> None:
+    chain_model = board._net_model
+    board._net_model = net_model
+    try:
+        board._convert_to_graphs()
+    finally:
+        board._net_model = chain_model
+
+
+def alternate_revisions(board: PcbBoard, revisions: list):
+    # Each call applies the next of the revisions (loaded boards of the same net model) to the graphs of the
+    # previous one, the way update_from_file does after reading the file
+    state = {'board': board, 'index': 0}
+
+    def update():
+        state['index'] = (state['index'] + 1) % len(revisions)
+        revision = copy.copy(revisions[state['index']])
+        revision._components_graph = state['board']._components_graph
+        revision._pads_graph = state['board']._pads_graph
+        revision._update_graphs(state['board'])
+        state['board'] = revision
+
+    return update
+
+
+def run_scale(name: str, repeat: int) -> dict:
+    footprints, pads_per_footprint, distribution, with_planarity = SCALES[name]
+    filename = f"synthetic-{name}.kicad_pcb"
+    register_board(filename, generate_board(footprints, pads_per_footprint, distribution, seed=footprints))
+
+    board = PcbBoard(filename)
+    board.load_from_file(filename)
+
+    directory = tempfile.TemporaryDirectory()
+    kicad_filename = os.path.join(directory.name, filename)
+    write_kicad_pcb(board._board, kicad_filename)
+
+    # Every tenth footprint moved, the rest of the file is copied
+    moved_board = PcbBoard(filename)
+    moved_board.load_from_file(kicad_filename, "sexpr")
+    moved_board.update_component_positions({component: {'x': 0.0, 'y': 0.0} for component in board.get_components()[::10]})
+    # A revision with every hundredth footprint moved, an ECO update to it and back relinks the nets of their pads
+    revised_filename = os.path.join(directory.name, f"revised-{filename}")
+    revising_board = PcbBoard(filename)
+    revising_board.load_from_file(kicad_filename, "sexpr")
+    revising_board.update_component_positions({component: {'x': 0.0, 'y': 0.0} for component in board.get_components()[::100]})
+    revising_board.save_to_file(revised_filename)
+    revised_board = PcbBoard(filename, "mst")
+    revised_board.load_from_file(kicad_filename, "sexpr")
+
+    def update_board():
+        revised_board.update_from_file(revised_filename, "sexpr")
+        revised_board.update_from_file(kicad_filename, "sexpr")
+
+    # ECO updates without reading the files, to compare with converting the whole board again
+    revisions = []
+    for net_model, revision_filename in [("mst", kicad_filename), ("mst", revised_filename), ("chain", kicad_filename)]:
+        revisions.append(PcbBoard(filename, net_model))
+        revisions[-1].load_from_file(revision_filename, "sexpr")
+
+    components_graph = board.get_components_graph()
+    pads_graph = board.get_pads_graph()
+
+    # Footprints scattered over four times their total area, with the overlaps that leaves
+    dimensions = board.get_component_dimensions()
+    side = 2 * sum(size['width'] * size['height'] for size in dimensions.values()) ** 0.5
+    generator = np.random.default_rng(footprints)
+    scattered = {component: {'x': x, 'y': y} for component, (x, y) in zip(dimensions, generator.uniform(0, side, (len(dimensions), 2)).tolist())}
+
+    stages = {
+        'load_board': lambda: PcbBoard(filename).load_from_file(filename),
+        'load_board_sexpr': lambda: PcbBoard(filename).load_from_file(kicad_filename, "sexpr"),
+        'save_board': moved_board.save_to_bytes,
+        'update_board_sexpr': update_board,
+        'extract': board._extract_components_pads_nets_connections,
+        'convert_to_graphs': board._convert_to_graphs,
+        'convert_to_graphs_mst': lambda: convert_with_model(board, "mst"),
+        'convert_to_graphs_star': lambda: convert_with_model(board, "star"),
+        'update_graphs_mst': alternate_revisions(revisions[0].clone(), revisions[:2]),
+        'update_graphs_unchanged': alternate_revisions(revisions[2].clone(), revisions[2:]),
+        'component_dimensions': board.get_component_dimensions,
+        'legalize': lambda: legalize(scattered, dimensions),
+        'connections': board.get_connections,
+        'pads_graph_copy': lambda: Graph.copy(pads_graph),
+        'pads_graph_components': lambda: Graph.connected_components(pads_graph),
+        'pads_graph_degrees': pads_graph.get_degrees,
+        'pads_graph_analytics': lambda: DegreeAnalytics(pads_graph),
+        'pads_graph_fingerprint': lambda: Graph.fingerprint(pads_graph),
+        'components_graph_copy': lambda: Graph.copy(components_graph),
+        'components_graph_components': lambda: Graph.connected_components(components_graph),
+        'components_graph_to_compact': lambda: CompactGraph.from_graph(components_graph),
+        'components_graph_thickness': lambda: Planarity.thickness_bounds(components_graph),
+    }
+
+    # Without OGDF the planarity stages are skipped, the baseline keeps their previous timings
+    if with_planarity and importlib.util.find_spec("ogdf_python") is None:
+        print(f"{name:>8} planarity stages skipped, ogdf_python is not installed", flush=True)
+    elif with_planarity:
+        def decomposition():
+            planarity._decomposition_cache.clear()
+            planarity._component_cache.clear()
+            return Planarity.max_planar_subgraphs(components_graph, workers=1)
+
+        planar_subgraphs = decomposition()
+
+        def layout():
+            planarity._layout_cache.clear()
+            placement, _ = Planarity.find_layout_of_planar_graph(planar_subgraphs[Planarity.placement_layer(planar_subgraphs)], dimensions, 10.0)
+            return [Planarity.draw_at_placement(subgraph, dimensions, placement) for subgraph in planar_subgraphs]
+
+        def to_ogdf():
+            graph._ogdf_graphs.clear()
+            return Graph.to_ogdf_graph(components_graph)
+
+        stages['components_graph_to_ogdf'] = to_ogdf
+        stages['max_planar_subgraphs'] = decomposition
+        stages['layouts'] = layout
+
+    results = {}
+    for stage, function in stages.items():
+        results[stage] = measure(function, repeat)
+        print(f"{name:>8} {stage:<28} {results[stage]:10.4f} s", flush=True)
+
+    directory.cleanup()
+    return results
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for scale, stages in results.items():
+        for stage, seconds in stages.items():
+            reference = baseline.get(scale, {}).get(stage)
+            if reference is None or seconds < MIN_REPORTED_SECONDS:
+                continue
+            if seconds > reference * (1 + tolerance):
+                regressions.append(f"{scale}/{stage}: {seconds:.4f} s vs baseline {reference:.4f} s")
+    return regressions
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark board extraction, graph operations and planarity on synthetic boards.")
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=list(SCALES), help="board sizes to run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage, the fastest one is reported")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown relative to the baseline (0.5 = 50%%)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline timings file")
+    parser.add_argument("--update-baseline", action="store_true", help="store the measured timings as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = {scale: run_scale(scale, args.repeat) for scale in args.scales}
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    if args.update_baseline:
+        for scale, stages in results.items():
+            baseline.setdefault(scale, {}).update({stage: round(seconds, 6) for stage, seconds in stages.items()})
+        with open(args.baseline, "w") as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    regressions = find_regressions(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
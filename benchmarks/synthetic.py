@@ -0,0 +1,192 @@
+import sys
+import types
+
+import numpy as np
+
+
+# Minimal stand-ins for the parts of the pcbnew API used by PcbBoard, so boards can be generated
+# and benchmarked without KiCad installed.
+class VECTOR2I:
+    def __init__(self, x: int, y: int) -> None:
+        self.x = x
+        self.y = y
+
+
+class NETINFO_ITEM:
+    def __init__(self, code: int, name: str) -> None:
+        self._code = code
+        self._name = name
+
+    def GetNetCode(self) -> int:
+        return self._code
+
+    def GetNetname(self) -> str:
+        return self._name
+
+
+class PAD:
+    def __init__(self, footprint, number: str, net: NETINFO_ITEM, position: VECTOR2I) -> None:
+        self._footprint = footprint
+        self._number = number
+        self._net = net
+        self._position = position
+
+    def GetParentAsString(self) -> str:
+        return self._footprint.GetReference()
+
+    def GetPadName(self) -> str:
+        return self._number
+
+    def GetNet(self) -> NETINFO_ITEM:
+        return self._net
+
+    def GetNetCode(self) -> int:
+        return self._net.GetNetCode()
+
+    def GetPosition(self) -> VECTOR2I:
+        return self._position
+
+
+class FOOTPRINT:
+    def __init__(self, reference: str, position: VECTOR2I) -> None:
+        self._reference = reference
+        self._position = position
+        self._pads = []
+
+    def GetReference(self) -> str:
+        return self._reference
+
+    def Pads(self) -> list:
+        return self._pads
+
+    def GetPosition(self) -> VECTOR2I:
+        return self._position
+
+    def SetPosition(self, position: VECTOR2I) -> None:
+        self._position = position
+
+
+class BOARD:
+    def __init__(self, footprints: list, nets: list) -> None:
+        self._footprints = footprints
+        self._nets = nets
+
+    def Footprints(self) -> list:
+        return self._footprints
+
+    def GetNetsByName(self) -> dict:
+        # pcbnew's NETNAMES_MAP is ordered by name
+        return {net.GetNetname(): net for net in sorted(self._nets, key=lambda net: net.GetNetname())}
+
+    def Save(self, filename: str) -> None:
+        with open(filename, "w") as file:
+            for footprint in self._footprints:
+                position = footprint.GetPosition()
+                file.write(f"{footprint.GetReference()} {position.x} {position.y}\n")
+
+
+_boards = {}
+
+
+def LoadBoard(filename: str) -> BOARD:
+    return _boards[filename]
+
+
+def install_pcbnew_stand_in() -> None:
+    # Registers this module's stand-ins as `pcbnew`, boards are "loaded" from the generator registry
+    module = types.ModuleType("pcbnew")
+    for name in ("VECTOR2I", "NETINFO_ITEM", "PAD", "FOOTPRINT", "BOARD", "LoadBoard"):
+        setattr(module, name, globals()[name])
+    sys.modules["pcbnew"] = module
+
+
+def register_board(filename: str, board: BOARD) -> None:
+    _boards[filename] = board
+
+
+def write_kicad_pcb(board: BOARD, filename: str, tracks_per_footprint: int = 4) -> None:
+    # Serializes a generated board as a .kicad_pcb file with footprints at rotation 0, plus some tracks and
+    # graphics that file readers have to skip
+    def mm(value: int) -> str:
+        return f"{value / 10**6:.6f}"
+
+    with open(filename, "w") as file:
+        file.write('(kicad_pcb (version 20221018) (generator synthetic)\n')
+        for net in board.GetNetsByName().values():
+            file.write(f'  (net {net.GetNetCode()} "{net.GetNetname()}")\n')
+
+        for footprint in board.Footprints():
+            origin = footprint.GetPosition()
+            file.write('  (footprint "Synthetic:Package" (layer "F.Cu")\n')
+            file.write(f'    (at {mm(origin.x)} {mm(origin.y)})\n')
+            file.write(f'    (property "Reference" "{footprint.GetReference()}" (at 0 -3 0) (layer "F.SilkS"))\n')
+            file.write('    (fp_line (start -2.5 -2.5) (end 2.5 -2.5) (stroke (width 0.12) (type solid)) (layer "F.SilkS"))\n')
+            for pad in footprint.Pads():
+                position = pad.GetPosition()
+                net = pad.GetNet()
+                file.write(f'    (pad "{pad.GetPadName()}" smd rect (at {mm(position.x - origin.x)} {mm(position.y - origin.y)}) '
+                           f'(size 0.5 0.5) (layers "F.Cu" "F.Paste" "F.Mask") (net {net.GetNetCode()} "{net.GetNetname()}"))\n')
+            file.write('  )\n')
+
+            for index in range(tracks_per_footprint):
+                file.write(f'  (segment (start {mm(origin.x)} {mm(origin.y + index)}) (end {mm(origin.x + 10**6)} {mm(origin.y + index)}) '
+                           f'(width 0.25) (layer "F.Cu") (net 0) (tstamp 00000000-0000-0000-0000-{index:012d}))\n')
+        file.write(')\n')
+
+
+def generate_net_sizes(pads_number: int, distribution: str, rng: np.random.Generator,
+                       max_net_size: int = 8, exponent: float = 2.5) -> list:
+    sizes = []
+    while pads_number > 1:
+        if distribution == "powerlaw":
+            size = int(rng.zipf(exponent)) + 1
+        elif distribution == "uniform":
+            size = int(rng.integers(2, max_net_size + 1))
+        elif distribution == "pairs":
+            size = 2
+        else:
+            raise ValueError(f"Unknown net size distribution: {distribution}")
+
+        size = min(size, pads_number)
+        sizes.append(size)
+        pads_number -= size
+
+    return sizes
+
+
+def generate_board(footprints_number: int, pads_per_footprint: int, distribution: str = "powerlaw",
+                   ground_fraction: float = 0.1, unconnected_fraction: float = 0.05, seed: int = 0) -> BOARD:
+    rng = np.random.default_rng(seed)
+    pads_number = footprints_number * pads_per_footprint
+
+    # Every pad gets a net id: 0 is unconnected, 1 is the giant ground net, the rest are signal nets
+    assignment = rng.permutation(pads_number)
+    ground_end = int(pads_number * ground_fraction)
+    unconnected_end = ground_end + int(pads_number * unconnected_fraction)
+
+    pad_nets = np.zeros(pads_number, dtype=np.int64)
+    pad_nets[assignment[:ground_end]] = 1
+
+    signal_pads = assignment[unconnected_end:]
+    sizes = generate_net_sizes(len(signal_pads), distribution, rng)
+    signal_nets = np.repeat(np.arange(2, 2 + len(sizes)), sizes)
+    pad_nets[signal_pads[:len(signal_nets)]] = signal_nets
+
+    nets = [NETINFO_ITEM(0, ""), NETINFO_ITEM(1, "GND")] + [NETINFO_ITEM(code, f"Net-{code}") for code in range(2, 2 + len(sizes))]
+
+    # Footprints on a jittered grid, pads spread over a 5 mm square around the footprint origin (positions in nm)
+    side = int(np.ceil(np.sqrt(footprints_number)))
+    origins = np.stack([np.arange(footprints_number) % side, np.arange(footprints_number) // side], axis=1) * 10 * 10**6
+    origins += rng.integers(0, 2 * 10**6, size=origins.shape)
+    offsets = rng.integers(-5 * 10**6 // 2, 5 * 10**6 // 2, size=(pads_number, 2))
+
+    footprints = []
+    for index in range(footprints_number):
+        footprint = FOOTPRINT(f"U{index + 1}", VECTOR2I(int(origins[index, 0]), int(origins[index, 1])))
+        for pad in range(pads_per_footprint):
+            pad_index = index * pads_per_footprint + pad
+            position = VECTOR2I(int(origins[index, 0] + offsets[pad_index, 0]), int(origins[index, 1] + offsets[pad_index, 1]))
+            footprint.Pads().append(PAD(footprint, str(pad + 1), nets[pad_nets[pad_index]], position))
+        footprints.append(footprint)
+
+    return BOARD(footprints, nets)
@@ -1,29 +1,86 @@
 import streamlit as st
+import threading
 
+from jobs import Job, submit_job
+from legalization import legalize
 from pcb_board import PcbBoard
 from planarity import Planarity
 from graph import Graph
 
+# Boards are shared between sessions, so moving footprints and saving must not interleave
+_export_lock = threading.Lock()
+
+# Seconds between two progress updates of a running build
+JOB_POLL_INTERVAL = 0.5
+
+
+def _build(job: Job, board: PcbBoard, separation: float, thickness: int) -> tuple[list, bytes, dict]:
+    # Decomposition, placement, drawings and export of a board, the share of the progress bar of each stage is a rough guess
+    components_graph = board.get_components_graph()
+    job.report("Decomposing into planar layers", 0.0)
+    planar_subgraphs = Planarity.max_planar_subgraphs(
+        components_graph,
+        progress=lambda layers: job.report("Decomposing into planar layers", 0.4 * min(layers / thickness, 1.0)),
+        check=job.check
+    )
+
+    job.report("Computing the placement", 0.4)
+    dimensions = board.get_component_dimensions()
+    placement, placement_drawing, placement_layer = {}, None, None
+    if len(planar_subgraphs) > 0:
+        placement_layer = Planarity.placement_layer(planar_subgraphs)
+        placement, placement_drawing = Planarity.find_layout_of_planar_graph(planar_subgraphs[placement_layer], dimensions, separation)
+
+    # The orthogonal layout does not guarantee that footprints keep apart
+    job.report("Separating overlapping footprints", 0.85)
+    embedding, legalization = legalize(placement, dimensions)
+
+    # Every layer is drawn where its footprints end up on the board, the layer the placement comes from keeps
+    # its routed drawing as long as legalization moved nothing
+    drawings = []
+    for index, subgraph in enumerate(planar_subgraphs):
+        job.report("Drawing the layers", 0.85 + 0.1 * index / len(planar_subgraphs))
+        if index == placement_layer and legalization['moved'] == 0:
+            drawings.append(placement_drawing)
+        else:
+            drawings.append(Planarity.draw_at_placement(subgraph, dimensions, embedding))
+
+    job.report("Saving the board", 0.95)
+    with _export_lock:
+        board.update_component_positions(embedding)
+        board_file = board.save_to_bytes()
+
+    return drawings, board_file, legalization
+
+
+@st.fragment(run_every=JOB_POLL_INTERVAL)
+def _build_progress(job: Job) -> None:
+    # Only this part is rerun while the build runs, the whole page once it is over
+    if job.done():
+        st.rerun(scope="app")
+    st.progress(job.progress, text=job.stage)
+
+
 def builder_layout(board: PcbBoard, st: st) -> None:
     st.subheader("PCB Builder") 
     
-    planar_subgraphs = Planarity.max_planar_subgraphs(board.get_components_graph())
-    thickness = len(planar_subgraphs)
+    # Only the bounds known without peeling any layer (or from a cached decomposition) are shown right away,
+    # the decomposition itself runs in the build and the number of layers it found is recommended once it is done
+    components_graph = board.get_components_graph()
+    lower_bound, thickness = Planarity.estimate_thickness(components_graph, time_budget=0)
+    thickness = max(thickness, 1)
 
-    st.write(f"Recommended layers number: {thickness}")
+    recommendation = st.empty()
+    with recommendation.container():
+        if lower_bound < thickness:
+            st.write(f"Layers needed: between {max(lower_bound, 1)} and {thickness}")
+        else:
+            st.write(f"Recommended layers number: {thickness}")
 
-    col1, col2, _ = st.columns(3, gap="large", vertical_alignment="center")
+    # The number of layers is the one the decomposition finds, there is no way to build for another one
+    col1, _, _ = st.columns(3, gap="large", vertical_alignment="center")
 
     with col1:
-        layers_number = st.slider(
-            "Select layers number:",
-            min_value=1,
-            max_value=2*thickness,
-            value=thickness, 
-            step=1
-        )
-
-    with col2:
         separation = st.number_input(
             "Enter separation:",
             min_value=1.0,
@@ -32,43 +89,56 @@ def builder_layout(board: PcbBoard, st: st) -> None:
             format="%.2f"
         )
 
-    embedding = Planarity.find_layout_of_planar_graph(
-        planar_subgraphs[0], 
-        board.get_component_dimensions(), 
-        separation,
-        "drawing.svg"
-    )
+    # One build per session, a build for other inputs cancels it. A failed build is only started again on request.
+    job = submit_job((id(board), separation), _build, board, separation, thickness,
+                     supersedes=st.session_state.get("builder_job"), retry=st.session_state.pop("builder_retry", False))
+    st.session_state["builder_job"] = job
 
     for _ in range(2):
         st.write("")
 
-    st.image("drawing.svg", use_container_width=True)
-
-    for _ in range(3):
-        st.write("")
-
-    col1, col2 = st.columns(2, gap="large", vertical_alignment="center")
+    if not job.done():
+        _build_progress(job)
+        return
+    # A job cancelled before it started is done without a result
+    if job.error is not None or job.result is None:
+        st.button("Retry build", on_click=lambda: st.session_state.update(builder_retry=True))
+        if job.error is not None:
+            raise job.error
+        st.warning("The build was cancelled.")
+        return
 
-    board.update_component_positions(embedding)
-    output_file = f"updated-{board.get_name()}.kicad_pcb"
-    board.save_to_file(output_file)
+    drawings, board_file, legalization = job.result
+    with recommendation.container():
+        st.write(f"Recommended layers number: {len(drawings)}")
+        if lower_bound < len(drawings):
+            st.caption(f"At least {max(lower_bound, 1)} layers are needed, fewer than the {len(drawings)} found may be enough.")
 
-    with col1:
-        with open("drawing.svg", "rb") as file:
+    tabs = st.tabs([f"Layer {index + 1}" for index in range(len(drawings))])
+    for index, (tab, drawing) in enumerate(zip(tabs, drawings)):
+        with tab:
+            st.image(drawing.decode(), use_container_width=True)
             st.download_button(
                 "Download SVG",
-                file,
-                "drawing.svg",
+                drawing,
+                f"drawing-layer-{index + 1}.svg",
                 "image/svg+xml",
+                key=f"download-svg-{index}",
                 use_container_width=True
             )
 
-    with col2:
-        with open(output_file, "rb") as file:
-            st.download_button(
-                "Download KiCad PCB",
-                file,
-                output_file,
-                "text/plain",
-                use_container_width=True
-            )
+    for _ in range(3):
+        st.write("")
+
+    if legalization['overlaps'] > 0:
+        st.caption(f"{legalization['moved']} footprints moved by {legalization['displacement']:.2f} mm in total "
+                   f"to resolve {legalization['overlaps']} overlaps.")
+    output_file = f"updated-{board.get_name()}.kicad_pcb"
+
+    st.download_button(
+        "Download KiCad PCB",
+        board_file,
+        output_file,
+        "text/plain",
+        use_container_width=True
+    )
\ No newline at end of file
@@ -0,0 +1,113 @@
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+class LruCache:
+    # Bounded in-memory LRU cache with an optional on-disk tier. Disk entries are pickled
+    # into `directory`, one file per key, so keys have to be valid file names (e.g. hex digests).
+    # With `max_bytes` set, entries are also evicted to keep the sum of `sizeof(value)` within budget.
+    def __init__(self, max_entries: int = 32, directory: str = None, max_bytes: int = None, sizeof=None) -> None:
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._sizeof = sizeof or (lambda value: len(pickle.dumps(value)))
+        self._total_bytes = 0
+        self._directory = directory
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if self._directory is not None:
+            os.makedirs(self._directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries or (self._directory is not None and os.path.exists(self._get_path(key)))
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        value = self._load(key)
+        if value is None:
+            with self._lock:
+                self.misses += 1
+            return default
+
+        with self._lock:
+            self.hits += 1
+            self._insert(key, value)
+        return value
+
+    def put(self, key: str, value) -> None:
+        with self._lock:
+            self._insert(key, value)
+        self._store(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes if self._max_bytes is not None else None
+            }
+
+    def _insert(self, key: str, value) -> None:
+        if key in self._entries:
+            self._evict(key)
+
+        if self._max_bytes is not None:
+            size = self._sizeof(value)
+            if size > self._max_bytes:
+                return
+            self._sizes[key] = size
+            self._total_bytes += size
+
+        self._entries[key] = value
+        while len(self._entries) > self._max_entries or (self._max_bytes is not None and self._total_bytes > self._max_bytes):
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, key: str) -> None:
+        del self._entries[key]
+        self._total_bytes -= self._sizes.pop(key, 0)
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self._directory, f"{key}.pkl")
+
+    def _load(self, key: str):
+        if self._directory is None:
+            return None
+
+        try:
+            with open(self._get_path(key), "rb") as file:
+                return pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _store(self, key: str, value) -> None:
+        if self._directory is None:
+            return
+
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        try:
+            with tempfile.NamedTemporaryFile("wb", dir=self._directory, delete=False) as file:
+                pickle.dump(value, file)
+            os.replace(file.name, self._get_path(key))
+        except OSError:
+            pass
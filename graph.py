@@ -1,9 +1,21 @@
-from ogdf_python import ogdf
+import hashlib
+import threading
+import weakref
+
+import numpy as np
+from scipy.sparse import csgraph, csr_matrix
+
+from native import ogdf
+
+# OGDF copies of graphs with the revision they were built at, dropped together with the graph
+_ogdf_graphs = weakref.WeakKeyDictionary()
+_ogdf_graphs_lock = threading.Lock()
 
 
 class Graph:
     def __init__(self) -> None:
         self._graph = {}
+        self._revision = 0
 
     def __str__(self) -> str:
         return str(self._graph)
@@ -11,10 +23,12 @@ class Graph:
     def add_vertex(self, vertex: str) -> None:
         if vertex not in self._graph:
             self._graph[vertex] = {}
+            self._revision += 1
 
     def remove_vertex(self, vertex: str) -> None:
         if vertex in self._graph:
             del self._graph[vertex]
+            self._revision += 1
             
         for _, edges in self._graph.items():
             if vertex in edges:
@@ -26,11 +40,13 @@ class Graph:
 
         self._graph[vertex1][vertex2] = properties
         self._graph[vertex2][vertex1] = properties
+        self._revision += 1
             
 
     def remove_edge(self, vertex1: str, vertex2: str) -> None:
         if vertex1 in self._graph and vertex2 in self._graph[vertex1]:
             del self._graph[vertex1][vertex2]
+            self._revision += 1
         
         if vertex2 in self._graph and vertex1 in self._graph[vertex2]:
             del self._graph[vertex2][vertex1]
@@ -81,36 +97,57 @@ class Graph:
     def get_degrees(self):
         return [self.get_degree(vertex) for vertex in self.get_vertices()]
 
+    def get_revision(self) -> int:
+        # Changes whenever a vertex or an edge is added or removed
+        return self._revision
+
+    @staticmethod
+    def connected_components_labels(graph) -> tuple[list, np.ndarray]:
+        if isinstance(graph, CompactGraph):
+            return graph._connected_components_labels()
+
+        vertices = graph.get_vertices()
+        ids = {vertex: index for index, vertex in enumerate(vertices)}
+        parents = list(range(len(vertices)))
+
+        def find(index: int) -> int:
+            while parents[index] != index:
+                parents[index] = parents[parents[index]]
+                index = parents[index]
+            return index
+
+        for vertex1, vertex2 in graph.get_edges():
+            root1, root2 = find(ids[vertex1]), find(ids[vertex2])
+            if root1 != root2:
+                parents[max(root1, root2)] = min(root1, root2)
+
+        # Components are numbered in order of their first vertex
+        roots = [find(index) for index in range(len(vertices))]
+        root_labels = {}
+        labels = np.array([root_labels.setdefault(root, len(root_labels)) for root in roots], dtype=np.int64)
+
+        return vertices, labels
+
     @staticmethod
     def connected_components(graph) -> list:
-        visited = set()
-        vertex_components = {}
-        components_count = 0
-        
-        def dfs(vertex: str):
-            visited.add(vertex)
-            vertex_components[vertex] = components_count
-            for neighbour in graph.get_neighbours(vertex):
-                if neighbour not in visited:
-                    dfs(neighbour)
+        vertices, labels = Graph.connected_components_labels(graph)
+
+        order = np.argsort(labels, kind='stable')
+        _, starts = np.unique(labels[order], return_index=True)
+
+        return [GraphView(graph, [vertices[index] for index in component.tolist()])
+                for component in np.split(order, starts[1:]) if len(component) > 0]
 
-        for vertex in graph.get_vertices():
-            if vertex not in visited:
-                components_count += 1
-                dfs(vertex)
-                
-        connected_components = [Graph() for _ in range(components_count)]
-        for edge in graph.get_edges():
-            vertex1, vertex2 = edge
-            connected_components[vertex_components[vertex1] - 1].add_edge(vertex1, vertex2, graph.get_edge_properties(vertex1, vertex2))
-        
-        
-        return connected_components
-    
     @staticmethod
     def merge_graphs(graphs: list):
+        if len(graphs) > 0 and all(isinstance(graph, CompactGraph) for graph in graphs):
+            return CompactGraph.merge(graphs)
+
         merged_graph = Graph()
         for graph in graphs:
+            for vertex in graph.get_vertices():
+                merged_graph.add_vertex(vertex)
+
             for edge in graph.get_edges():
                 vertex1, vertex2 = edge
                 properties = graph.get_edge_properties(vertex1, vertex2)
@@ -120,7 +157,17 @@ class Graph:
     
     @staticmethod
     def copy(graph):
+        if isinstance(graph, CompactGraph):
+            return graph.clone()
+
         copied_graph = Graph()
+        if type(graph) is Graph:
+            copied_graph._graph = {vertex: dict(neighbours) for vertex, neighbours in graph._graph.items()}
+            return copied_graph
+
+        for vertex in graph.get_vertices():
+            copied_graph.add_vertex(vertex)
+
         for edge in graph.get_edges():
             vertex1, vertex2 = edge
             properties = graph.get_edge_properties(vertex1, vertex2)
@@ -128,26 +175,513 @@ class Graph:
 
         return copied_graph
     
+    @staticmethod
+    def fingerprint(graph) -> str:
+        # Canonical hash of the vertex and edge sets, independent of insertion order and edge direction
+        digest = hashlib.sha256()
+        for vertex in sorted(graph.get_vertices()):
+            digest.update(vertex.encode() + b"\0")
+        digest.update(b"\1")
+        for vertex1, vertex2 in sorted(tuple(sorted(edge)) for edge in graph.get_edges()):
+            digest.update(vertex1.encode() + b"\0" + vertex2.encode() + b"\0")
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def degeneracy(graph) -> int:
+        # Largest minimum degree over all subgraphs, found by repeatedly removing a vertex of minimum degree
+        neighbours = {vertex: [neighbour for neighbour in graph.get_neighbours(vertex) if neighbour != vertex]
+                      for vertex in graph.get_vertices()}
+        degrees = {vertex: len(vertex_neighbours) for vertex, vertex_neighbours in neighbours.items()}
+        buckets = {}
+        for vertex, degree in degrees.items():
+            buckets.setdefault(degree, set()).add(vertex)
+
+        degeneracy, degree = 0, 0
+        for _ in range(len(degrees)):
+            # A removal lowers degrees by one at most, so the minimum is at most one below the last one
+            degree = max(degree - 1, 0)
+            while not buckets.get(degree):
+                degree += 1
+            vertex = buckets[degree].pop()
+            degeneracy = max(degeneracy, degree)
+
+            del degrees[vertex]
+            for neighbour in neighbours[vertex]:
+                if neighbour in degrees:
+                    buckets[degrees[neighbour]].remove(neighbour)
+                    degrees[neighbour] -= 1
+                    buckets.setdefault(degrees[neighbour], set()).add(neighbour)
+
+        return degeneracy
+
     @staticmethod
     def to_ogdf_graph(graph):
+        # A bound graph already has its OGDF graph and any other graph keeps the one built for it until it
+        # changes, so repeated planarity tests and layouts do not rebuild it. It must be treated as read-only.
+        if isinstance(graph, BoundGraph):
+            return graph.get_ogdf_graph(), graph._nodes
+
+        cached = isinstance(graph, Graph)
+        if cached:
+            with _ogdf_graphs_lock:
+                revision, cpp_graph, vertices_mapping = _ogdf_graphs.get(graph, (None, None, None))
+            if revision == graph.get_revision():
+                return cpp_graph, vertices_mapping
+
+        # get_edges lists every edge once, so there is no need to search for existing ones
         cpp_graph = ogdf.Graph()
         vertices_mapping = {vertex: cpp_graph.newNode() for vertex in graph.get_vertices()}
+        for vertex1, vertex2 in graph.get_edges():
+            cpp_graph.newEdge(vertices_mapping[vertex1], vertices_mapping[vertex2])
 
-        for edge in graph.get_edges():
-            vertex1, vertex2 = edge
-            if not cpp_graph.searchEdge(vertices_mapping[vertex1], vertices_mapping[vertex2]):
-                cpp_graph.newEdge(vertices_mapping[vertex1], vertices_mapping[vertex2])
-
+        if cached:
+            with _ogdf_graphs_lock:
+                _ogdf_graphs[graph] = graph.get_revision(), cpp_graph, vertices_mapping
         return cpp_graph, vertices_mapping
     
     @staticmethod
     def from_ogdf_graph(cpp_graph, vertices_mapping):
-        reversed_vertices_mapping = {node: vertex for vertex, node in vertices_mapping.items()}
+        reversed_vertices_mapping = {node.index(): vertex for vertex, node in vertices_mapping.items()}
         graph = Graph()
 
         for edge in cpp_graph.edges:
-            vertex1 = reversed_vertices_mapping[edge.source()]
-            vertex2 = reversed_vertices_mapping[edge.target()]
+            vertex1 = reversed_vertices_mapping[edge.source().index()]
+            vertex2 = reversed_vertices_mapping[edge.target().index()]
             graph.add_edge(vertex1, vertex2)
 
-        return graph
\ No newline at end of file
+        return graph
+
+class CompactGraph(Graph):
+    # Same interface as Graph, but vertex names are interned into integer ids and the adjacency
+    # is kept in CSR buffers (indptr / indices / edge ids) over a flat edge table. Mutations are
+    # applied to the edge table and degree counters right away, the CSR buffers are rebuilt lazily
+    # on the next adjacency query.
+    def __init__(self) -> None:
+        self._revision = 0
+        self._names = []
+        self._ids = {}
+        self._vertices_number = 0
+        self._degrees = np.zeros(0, dtype=np.int64)
+
+        self._sources = np.zeros(0, dtype=np.int64)
+        self._targets = np.zeros(0, dtype=np.int64)
+        self._alive = np.zeros(0, dtype=bool)
+        self._properties = []
+        self._added = {}
+        self._edges_number = 0
+
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int64)
+        self._edge_ids = np.zeros(0, dtype=np.int64)
+
+    def __str__(self) -> str:
+        return str({vertex: self.get_neighbours(vertex) for vertex in self.get_vertices()})
+
+    @staticmethod
+    def from_edges(vertices: list, sources, targets, properties: list=None):
+        graph = CompactGraph()
+        for vertex in vertices:
+            graph.add_vertex(vertex)
+
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        graph._sources = np.minimum(sources, targets)
+        graph._targets = np.maximum(sources, targets)
+        graph._alive = np.ones(len(sources), dtype=bool)
+        graph._properties = list(properties) if properties is not None else [{} for _ in range(len(sources))]
+        graph._edges_number = len(sources)
+
+        loops = graph._sources == graph._targets
+        np.add.at(graph._degrees, graph._sources, 1)
+        np.add.at(graph._degrees, graph._targets[~loops], 1)
+        graph._build_csr()
+
+        return graph
+
+    @staticmethod
+    def from_graph(graph: Graph):
+        if isinstance(graph, CompactGraph):
+            return graph.clone()
+
+        vertices = graph.get_vertices()
+        ids = {vertex: index for index, vertex in enumerate(vertices)}
+        edges = graph.get_edges()
+        sources = [ids[vertex1] for vertex1, _ in edges]
+        targets = [ids[vertex2] for _, vertex2 in edges]
+        properties = [graph.get_edge_properties(vertex1, vertex2) for vertex1, vertex2 in edges]
+
+        return CompactGraph.from_edges(vertices, sources, targets, properties)
+
+    @staticmethod
+    def merge(graphs: list):
+        vertices = []
+        ids = {}
+        sources, targets, properties = [], [], []
+        for graph in graphs:
+            graph._flush()
+            for vertex in graph._names:
+                if vertex not in ids:
+                    ids[vertex] = len(vertices)
+                    vertices.append(vertex)
+
+            mapping = np.array([ids[vertex] for vertex in graph._names], dtype=np.int64)
+            sources.append(mapping[graph._sources])
+            targets.append(mapping[graph._targets])
+            properties.extend(graph._properties)
+
+        sources = np.concatenate(sources)
+        targets = np.concatenate(targets)
+        keys = np.minimum(sources, targets) * len(vertices) + np.maximum(sources, targets)
+
+        # Edges present in several graphs keep the properties of the last one, as with add_edge
+        _, last = np.unique(keys[::-1], return_index=True)
+        kept = np.sort(len(keys) - 1 - last)
+
+        return CompactGraph.from_edges(vertices, sources[kept], targets[kept], [properties[index] for index in kept.tolist()])
+
+    def clone(self):
+        self._flush()
+
+        cloned_graph = CompactGraph()
+        cloned_graph._names = list(self._names)
+        cloned_graph._ids = dict(self._ids)
+        cloned_graph._vertices_number = self._vertices_number
+        cloned_graph._degrees = self._degrees.copy()
+        cloned_graph._sources = self._sources.copy()
+        cloned_graph._targets = self._targets.copy()
+        cloned_graph._alive = self._alive.copy()
+        cloned_graph._properties = list(self._properties)
+        cloned_graph._edges_number = self._edges_number
+        cloned_graph._indptr = self._indptr.copy()
+        cloned_graph._indices = self._indices.copy()
+        cloned_graph._edge_ids = self._edge_ids.copy()
+
+        return cloned_graph
+
+    def add_vertex(self, vertex: str) -> None:
+        if vertex in self._ids:
+            return
+
+        self._ids[vertex] = len(self._names)
+        self._names.append(vertex)
+        self._vertices_number += 1
+        self._revision += 1
+
+        if len(self._names) > len(self._degrees):
+            degrees = np.zeros(max(16, 2 * len(self._degrees)), dtype=np.int64)
+            degrees[:len(self._degrees)] = self._degrees
+            self._degrees = degrees
+
+    def remove_vertex(self, vertex: str) -> None:
+        if vertex not in self._ids:
+            return
+
+        # Looking up the neighbours rebuilds pending adjacency changes, which an isolated vertex does not need
+        if self._degrees[self._ids[vertex]] > 0:
+            for neighbour in self.get_neighbours(vertex):
+                self.remove_edge(vertex, neighbour)
+
+        index = self._ids.pop(vertex)
+        self._names[index] = None
+        self._vertices_number -= 1
+        self._revision += 1
+
+    def add_edge(self, vertex1: str, vertex2: str, properties: dict={}) -> None:
+        self.add_vertex(vertex1)
+        self.add_vertex(vertex2)
+
+        index1, index2 = self._ids[vertex1], self._ids[vertex2]
+        key = (min(index1, index2), max(index1, index2))
+        edge_id = self._find_edge(*key)
+        if edge_id is not None:
+            self._properties[edge_id] = properties
+            return
+
+        if key in self._added:
+            self._added[key] = properties
+            return
+
+        self._added[key] = properties
+        self._edges_number += 1
+        self._revision += 1
+        self._degrees[index1] += 1
+        if index1 != index2:
+            self._degrees[index2] += 1
+
+    def remove_edge(self, vertex1: str, vertex2: str) -> None:
+        if vertex1 not in self._ids or vertex2 not in self._ids:
+            return
+
+        index1, index2 = self._ids[vertex1], self._ids[vertex2]
+        key = (min(index1, index2), max(index1, index2))
+        edge_id = self._find_edge(*key)
+        if edge_id is not None:
+            self._alive[edge_id] = False
+        elif key in self._added:
+            del self._added[key]
+        else:
+            return
+
+        self._edges_number -= 1
+        self._revision += 1
+        self._degrees[index1] -= 1
+        if index1 != index2:
+            self._degrees[index2] -= 1
+
+    def edge_exists(self, vertex1: str, vertex2: str) -> bool:
+        return self._edge_key(vertex1, vertex2) is not None
+
+    def update_edge(self, vertex1: str, vertex2: str, update):
+        key = self._edge_key(vertex1, vertex2)
+        if key is None:
+            return
+
+        if isinstance(key, tuple):
+            self._added[key] = update(self._added[key])
+        else:
+            self._properties[key] = update(self._properties[key])
+
+    def get_vertices(self):
+        return [vertex for vertex in self._names if vertex is not None]
+
+    def get_vertices_number(self):
+        return self._vertices_number
+
+    def get_edges(self):
+        self._flush()
+
+        edges = []
+        for index1, index2 in zip(self._sources.tolist(), self._targets.tolist()):
+            vertex1, vertex2 = self._names[index1], self._names[index2]
+            edges.append((vertex1, vertex2) if vertex1 <= vertex2 else (vertex2, vertex1))
+        return edges
+
+    def get_edges_number(self):
+        return self._edges_number
+
+    def get_neighbours(self, vertex):
+        if vertex not in self._ids:
+            return []
+
+        self._flush()
+
+        index = self._ids[vertex]
+        if index + 1 >= len(self._indptr):
+            return []
+        return [self._names[neighbour] for neighbour in self._indices[self._indptr[index]:self._indptr[index + 1]].tolist()]
+
+    def get_edge_properties(self, vertex1, vertex2):
+        key = self._edge_key(vertex1, vertex2)
+        if key is None:
+            return None
+
+        if isinstance(key, tuple):
+            return self._added[key]
+        return self._properties[key]
+
+    def get_degree(self, vertex):
+        if vertex not in self._ids:
+            return 0
+        return int(self._degrees[self._ids[vertex]])
+
+    def _connected_components_labels(self) -> tuple[list, np.ndarray]:
+        self._flush()
+        adjacency = csr_matrix((np.ones(len(self._indices), dtype=np.int8), self._indices, self._indptr),
+                               shape=(len(self._names), len(self._names)))
+        _, labels = csgraph.connected_components(adjacency, directed=False)
+
+        return list(self._names), labels
+
+    def get_degrees(self):
+        degrees = self._degrees[:len(self._names)]
+        if self._vertices_number == len(self._names):
+            return degrees.copy()
+        return degrees[np.array([vertex is not None for vertex in self._names], dtype=bool)]
+
+    # Returns the edge id for edges in the CSR buffers, the (id1, id2) key for pending edges
+    # or None when the edge does not exist
+    def _edge_key(self, vertex1: str, vertex2: str):
+        if vertex1 not in self._ids or vertex2 not in self._ids:
+            return None
+
+        index1, index2 = self._ids[vertex1], self._ids[vertex2]
+        key = (min(index1, index2), max(index1, index2))
+        if key in self._added:
+            return key
+        return self._find_edge(*key)
+
+    def _find_edge(self, index1: int, index2: int):
+        if index1 + 1 >= len(self._indptr):
+            return None
+
+        start, end = self._indptr[index1], self._indptr[index1 + 1]
+        position = start + np.searchsorted(self._indices[start:end], index2)
+        if position < end and self._indices[position] == index2:
+            edge_id = self._edge_ids[position]
+            if self._alive[edge_id]:
+                return int(edge_id)
+        return None
+
+    def _flush(self):
+        # Vertices added since the last rebuild also need their (empty) rows in the CSR buffers
+        if (len(self._added) == 0 and self._edges_number == len(self._sources) and self._vertices_number == len(self._names)
+                and len(self._indptr) == len(self._names) + 1):
+            return
+
+        alive = np.flatnonzero(self._alive)
+        sources = np.concatenate([self._sources[alive], np.array([key[0] for key in self._added], dtype=np.int64)])
+        targets = np.concatenate([self._targets[alive], np.array([key[1] for key in self._added], dtype=np.int64)])
+        properties = [self._properties[edge_id] for edge_id in alive.tolist()] + list(self._added.values())
+
+        if self._vertices_number != len(self._names):
+            # Drop removed vertices and renumber the remaining ones
+            kept = np.array([vertex is not None for vertex in self._names], dtype=bool)
+            renumbering = np.cumsum(kept) - 1
+            sources, targets = renumbering[sources], renumbering[targets]
+            self._degrees = self._degrees[:len(self._names)][kept]
+            self._names = [vertex for vertex in self._names if vertex is not None]
+            self._ids = {vertex: index for index, vertex in enumerate(self._names)}
+
+        self._sources, self._targets = sources, targets
+        self._alive = np.ones(len(sources), dtype=bool)
+        self._properties = properties
+        self._added = {}
+        self._build_csr()
+
+    def _build_csr(self):
+        edge_ids = np.arange(len(self._sources), dtype=np.int64)
+        loops = self._sources == self._targets
+
+        rows = np.concatenate([self._sources, self._targets[~loops]])
+        columns = np.concatenate([self._targets, self._sources[~loops]])
+        edge_ids = np.concatenate([edge_ids, edge_ids[~loops]])
+
+        order = np.lexsort((columns, rows))
+        self._indices = columns[order]
+        self._edge_ids = edge_ids[order]
+        self._indptr = np.zeros(len(self._names) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(self._names)), out=self._indptr[1:])
+
+
+
+class GraphView:
+    # Read-only view of the subgraph of `graph` induced by `vertices`, nothing is copied
+    def __init__(self, graph: Graph, vertices: list) -> None:
+        self._parent = graph
+        self._vertices = vertices
+        self._members = set(vertices)
+        self._edges_number = None
+
+    def __str__(self) -> str:
+        return str({vertex: self.get_neighbours(vertex) for vertex in self._vertices})
+
+    def edge_exists(self, vertex1: str, vertex2: str) -> bool:
+        return vertex1 in self._members and vertex2 in self._members and self._parent.edge_exists(vertex1, vertex2)
+
+    def get_vertices(self):
+        return list(self._vertices)
+
+    def get_vertices_number(self):
+        return len(self._vertices)
+
+    def get_edges(self):
+        edges = []
+        for vertex in self._vertices:
+            for neighbour in self.get_neighbours(vertex):
+                if vertex <= neighbour:
+                    edges.append((vertex, neighbour))
+        return edges
+
+    def get_edges_number(self):
+        if self._edges_number is None:
+            self._edges_number = len(self.get_edges())
+        return self._edges_number
+
+    def get_neighbours(self, vertex):
+        if vertex not in self._members:
+            return []
+        return [neighbour for neighbour in self._parent.get_neighbours(vertex) if neighbour in self._members]
+
+    def get_edge_properties(self, vertex1, vertex2):
+        if vertex1 in self._members and vertex2 in self._members:
+            return self._parent.get_edge_properties(vertex1, vertex2)
+        return None
+
+    def get_degree(self, vertex):
+        return len(self.get_neighbours(vertex))
+
+    def get_degrees(self):
+        return [self.get_degree(vertex) for vertex in self._vertices]
+
+
+class BoundGraph(Graph):
+    # A Graph with an OGDF graph attached: every vertex and edge added or removed is applied to both, so
+    # the OGDF side is never rebuilt. Nodes and edges are mapped through their OGDF indices.
+    def __init__(self) -> None:
+        super().__init__()
+        self._ogdf_graph = ogdf.Graph()
+        self._nodes = {}
+        self._node_vertices = {}
+        self._ogdf_edges = {}
+        self._edge_vertices = {}
+
+    @staticmethod
+    def from_graph(graph: Graph):
+        bound_graph = BoundGraph()
+        for vertex in graph.get_vertices():
+            bound_graph.add_vertex(vertex)
+        for vertex1, vertex2 in graph.get_edges():
+            bound_graph.add_edge(vertex1, vertex2, graph.get_edge_properties(vertex1, vertex2))
+
+        return bound_graph
+
+    def add_vertex(self, vertex: str) -> None:
+        if vertex not in self._graph:
+            super().add_vertex(vertex)
+            node = self._ogdf_graph.newNode()
+            self._nodes[vertex] = node
+            self._node_vertices[node.index()] = vertex
+
+    def remove_vertex(self, vertex: str) -> None:
+        if vertex in self._graph:
+            for neighbour in list(self._graph[vertex]):
+                self.remove_edge(vertex, neighbour)
+            super().remove_vertex(vertex)
+            node = self._nodes.pop(vertex)
+            del self._node_vertices[node.index()]
+            self._ogdf_graph.delNode(node)
+
+    def add_edge(self, vertex1: str, vertex2: str, properties: dict={}) -> None:
+        self.add_vertex(vertex1)
+        self.add_vertex(vertex2)
+        if not self.edge_exists(vertex1, vertex2):
+            edge = self._ogdf_graph.newEdge(self._nodes[vertex1], self._nodes[vertex2])
+            self._ogdf_edges[self._edge_key(vertex1, vertex2)] = edge
+            self._edge_vertices[edge.index()] = (vertex1, vertex2)
+        super().add_edge(vertex1, vertex2, properties)
+
+    def remove_edge(self, vertex1: str, vertex2: str) -> None:
+        if self.edge_exists(vertex1, vertex2):
+            edge = self._ogdf_edges.pop(self._edge_key(vertex1, vertex2))
+            del self._edge_vertices[edge.index()]
+            self._ogdf_graph.delEdge(edge)
+        super().remove_edge(vertex1, vertex2)
+
+    def get_ogdf_graph(self):
+        return self._ogdf_graph
+
+    def get_node(self, vertex: str):
+        return self._nodes[vertex]
+
+    def get_node_vertex(self, node) -> str:
+        return self._node_vertices[node.index()]
+
+    def get_ogdf_edge(self, vertex1: str, vertex2: str):
+        return self._ogdf_edges.get(self._edge_key(vertex1, vertex2))
+
+    def get_ogdf_edge_vertices(self, edge) -> tuple[str, str]:
+        return self._edge_vertices[edge.index()]
+
+    def _edge_key(self, vertex1: str, vertex2: str) -> tuple[str, str]:
+        return (vertex1, vertex2) if vertex1 <= vertex2 else (vertex2, vertex1)
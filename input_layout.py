@@ -1,7 +1,23 @@
 import streamlit as st
+import hashlib
 import os
 
-from pcb_board import PcbBoard
+from pcb_board import NET_MODELS, PcbBoard
+
+
+BOARD_CACHE_ENTRIES = 8
+
+# With sexpr boards are read by the streaming parser and written by kicad_writer, so pcbnew is never loaded
+BOARD_READER = os.environ.get("LINKBOARD_BOARD_READER", "sexpr")
+
+
+# Shared by all sessions, keyed by the hash of the uploaded bytes, the file name and the net model
+@st.cache_resource(max_entries=BOARD_CACHE_ENTRIES, show_spinner=False)
+def _load_board(digest: str, name: str, net_model: str, _data: bytes) -> PcbBoard:
+    board = PcbBoard(name, net_model)
+    board.load_from_bytes(_data, BOARD_READER)
+
+    return board
 
 
 def input_layout(st: st) -> PcbBoard:
@@ -9,14 +25,45 @@ def input_layout(st: st) -> PcbBoard:
     st.write("Paste project with all footprints and no connections.")
 
     uploaded_file = st.file_uploader("Upload a KiCad PCB file (*.kicad_pcb)", type=["kicad_pcb"])
+    net_model = st.selectbox(
+        "Net topology model:",
+        NET_MODELS,
+        format_func=lambda model: {
+            'chain': "Chain (pad order)",
+            'mst': "Minimum spanning tree",
+            'star': "Star from net centroid"
+        }[model]
+    )
+
     if uploaded_file is not None:
-        temp_filename = os.path.join("/app", uploaded_file.name)
-        with open(temp_filename, "wb") as f:
-            f.write(uploaded_file.getbuffer())
+        # Reruns of the same session reuse the board without even hashing the upload again
+        session_key = (uploaded_file.file_id, net_model)
+        session_board = st.session_state.get("board")
+        if session_board is not None and session_board[0] == session_key:
+            st.success("PCB loaded successfully!")
+            return session_board[1]
 
         try:
-            board = PcbBoard(uploaded_file.name)
-            board.load_from_file(temp_filename)
+            data = uploaded_file.getvalue()
+            digest = hashlib.sha256(data).hexdigest()
+            if session_board is not None and session_board[0][1] == net_model and session_board[1].get_name() == uploaded_file.name:
+                if session_board[2] == digest:
+                    # The same file uploaded again, nothing changed
+                    st.session_state["board"] = (session_key, session_board[1], digest)
+                    st.success("PCB loaded successfully!")
+                    return session_board[1]
+
+                # A new revision of the board of this session: only the changed nets are linked again, on a copy,
+                # as the previous board may be shared with other sessions
+                board = session_board[1].clone()
+                changes = board.update_from_bytes(data, BOARD_READER)
+                st.session_state["board"] = (session_key, board, digest)
+                st.success(f"PCB updated: {len(changes['changed_nets'])} nets changed, {len(changes['added_components'])} "
+                           f"components added, {len(changes['removed_components'])} removed.")
+                return board
+
+            board = _load_board(digest, uploaded_file.name, net_model, data)
+            st.session_state["board"] = (session_key, board, digest)
             st.success("PCB loaded successfully!")
 
             return board
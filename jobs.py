@@ -0,0 +1,92 @@
+import contextvars
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import profiling
+
+
+logger = logging.getLogger("linkboard.jobs")
+
+# Jobs of all sessions share these threads, the heavy parts of a job still run in the planarity process pools
+JOB_WORKERS = int(os.environ.get("LINKBOARD_JOB_WORKERS", "2"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    # A function run in a background thread. It gets the job as its first argument and reports its progress
+    # through it, every report is also where a cancelled job stops. Its profiling stages go to its own recorder.
+    def __init__(self, key, function, args: tuple) -> None:
+        self.key = key
+        self.stage = "Queued"
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.recorder = profiling.Recorder()
+        self._function = function
+        self._args = args
+        self._cancelled = threading.Event()
+        self._future = None
+
+    def report(self, stage: str, progress: float) -> None:
+        self.check()
+        self.stage, self.progress = stage, min(max(progress, 0.0), 1.0)
+
+    def check(self) -> None:
+        # Stops a cancelled job, long computations call it more often than they report
+        if self._cancelled.is_set():
+            raise JobCancelled()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+        if self._future is not None:
+            self._future.cancel()
+
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def done(self) -> bool:
+        return self._future is not None and self._future.done()
+
+    def _run(self):
+        if self._cancelled.is_set():
+            return
+        try:
+            with profiling.collect(self.recorder):
+                self.result = self._function(self, *self._args)
+            self.stage, self.progress = "Done", 1.0
+        except JobCancelled:
+            logger.info("Job %s cancelled at %s", self.key, self.stage)
+        except Exception as e:
+            self.error = e
+            logger.exception("Job %s failed at %s", self.key, self.stage)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="linkboard-job")
+    return _executor
+
+
+def submit_job(key, function, *args, supersedes: Job = None, retry: bool = False) -> Job:
+    # A job with the same key as the one it supersedes is kept, also once it failed (so that its error can be shown)
+    # unless retry is set. A job with another key cancels it.
+    if supersedes is not None:
+        if supersedes.key == key and not supersedes.cancelled() and (supersedes.error is None or not retry):
+            return supersedes
+        supersedes.cancel()
+
+    # The job runs in a copy of the submitting context, so it sees the same context variables (e.g. the open
+    # profiling stages) as if it ran in place
+    job = Job(key, function, args)
+    job._future = _get_executor().submit(contextvars.copy_context().run, job._run)
+    return job
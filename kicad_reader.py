@@ -0,0 +1,152 @@
+import io
+import itertools
+import math
+import re
+from collections import namedtuple
+
+
+Point = namedtuple("Point", ["x", "y"])
+
+CHUNK_SIZE = 1 << 20
+
+_TOKEN = re.compile(r'\(|\)|"(?:[^"\\]|\\.)*"|"|[^\s()"]+')
+_ESCAPE = re.compile(r'\\(.)')
+
+# Records kept while streaming, keyed by the head of the enclosing record. Everything else
+# (tracks, zones, drawings, 3D models, ...) is skipped without building any structure.
+_KEPT = {
+    'kicad_pcb': {'net', 'footprint', 'module'},
+    'footprint': {'at', 'property', 'fp_text', 'pad'},
+    'module': {'at', 'property', 'fp_text', 'pad'},
+    'pad': {'at', 'net'},
+}
+
+
+def _token_batches(stream):
+    # Chunks are cut after their last line break, so tokens never span two batches. A lone quote means a
+    # string runs over the cut (KiCad escapes line breaks in strings, so this is rare) and more is read.
+    buffer = ""
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        buffer += chunk
+        cut = buffer.rfind("\n") + 1 if chunk != "" else len(buffer)
+        tokens = _TOKEN.findall(buffer, 0, cut)
+        if '"' in tokens:
+            if chunk == "":
+                raise ValueError("Unterminated string in board file")
+            continue
+        yield tokens
+        buffer = buffer[cut:]
+        if chunk == "":
+            return
+
+
+def _tokens(stream):
+    return itertools.chain.from_iterable(_token_batches(stream))
+
+
+def _atom(token: str) -> str:
+    if token[0] != '"':
+        return token
+    if "\\" in token:
+        return _ESCAPE.sub(r'\1', token[1:-1])
+    return token[1:-1]
+
+
+def _children(tokens, head: str):
+    # Yields the children of the record just opened with `head`: atoms as strings, kept records
+    # as [head, ...], skipped records are consumed up to their closing parenthesis
+    kept = _KEPT.get(head, ())
+    for token in tokens:
+        if token == ")":
+            return
+        if token != "(":
+            yield _atom(token)
+            continue
+
+        child_head = _atom(next(tokens))
+        if child_head in kept:
+            yield [child_head] + list(_children(tokens, child_head))
+            continue
+
+        depth = 1
+        for token in tokens:
+            if token == "(":
+                depth += 1
+            elif token == ")":
+                depth -= 1
+                if depth == 0:
+                    break
+
+
+def _millimetres(value: str) -> int:
+    return round(float(value) * 10**6)
+
+
+def _net_key(record: list):
+    # (net 3 "GND") in most versions, (net "GND") when boards carry no net codes
+    if len(record) >= 3:
+        return int(record[1]), record[2]
+    return record[1], record[1]
+
+
+def _read_footprint(record: list, nets: dict) -> tuple:
+    reference = ""
+    origin_x, origin_y, angle = 0, 0, 0.0
+    pads = []
+
+    for child in record[1:]:
+        if not isinstance(child, list):
+            continue
+        if child[0] == 'at':
+            origin_x, origin_y = _millimetres(child[1]), _millimetres(child[2])
+            angle = float(child[3]) if len(child) > 3 and child[3] != 'locked' else 0.0
+        elif child[0] == 'property' and len(child) > 2 and child[1] == 'Reference':
+            reference = child[2]
+        elif child[0] == 'fp_text' and len(child) > 2 and child[1] == 'reference':
+            reference = child[2]
+        elif child[0] == 'pad':
+            pads.append(child)
+
+    # Pad positions are relative to the footprint and turn with it (KiCad's RotatePoint, y pointing down)
+    cos, sin = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+    footprint_pads = []
+    for pad in pads:
+        x, y, net_code = 0, 0, 0
+        for child in pad[2:]:
+            if not isinstance(child, list):
+                continue
+            if child[0] == 'at':
+                x, y = _millimetres(child[1]), _millimetres(child[2])
+            elif child[0] == 'net' and len(child) > 1:
+                net_code, net_name = _net_key(child)
+                nets.setdefault(net_code, net_name)
+
+        position = Point(origin_x + round(x * cos + y * sin), origin_y + round(y * cos - x * sin))
+        footprint_pads.append((pad[1] if len(pad) > 1 else "", net_code, position))
+
+    return reference, footprint_pads
+
+
+def read_board(stream) -> tuple[list, dict]:
+    # Streams a .kicad_pcb file (binary or text) and returns what PcbBoard._build_pad_table needs:
+    # [(footprint reference, [(pad number, net code, absolute position in nm), ...]), ...] and {net code: net name}
+    if isinstance(stream, (io.RawIOBase, io.BufferedIOBase)):
+        stream = io.TextIOWrapper(stream, encoding="utf-8", errors="replace")
+    tokens = _tokens(stream)
+
+    if next(tokens, None) != "(" or _atom(next(tokens, "")) != "kicad_pcb":
+        raise ValueError("Not a KiCad board file")
+
+    nets, footprints = {}, []
+    for record in _children(tokens, 'kicad_pcb'):
+        if not isinstance(record, list):
+            continue
+        if record[0] == 'net' and len(record) > 1:
+            net_code, net_name = _net_key(record)
+            nets[net_code] = net_name
+        else:
+            footprints.append(_read_footprint(record, nets))
+
+    # Same order as pcbnew's GetNetsByName
+    return footprints, dict(sorted(nets.items(), key=lambda item: item[1]))
@@ -0,0 +1,145 @@
+import re
+import shutil
+
+
+CHUNK_SIZE = 1 << 20
+
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+_ATOM = rb'[^\s()"]+'
+
+# Records starting a line. KiCad writes every record of the board and of its footprints on its own line,
+# indented by depth, and escapes line breaks inside strings, so these are found without tokenizing.
+_LINE = re.compile(
+    rb'\n([ \t]*)\((?:'
+    rb'((?:footprint|module)(?=[\s)]))'
+    rb'|at\s+(' + _ATOM + rb')\s+(' + _ATOM + rb')'
+    rb'|(?:property\s+"Reference"|fp_text\s+reference)\s+(' + _STRING + rb'|' + _ATOM + rb')'
+    rb')?'
+)
+
+# Strings, footprints, positions and references anywhere, for parts of a file not laid out like that.
+# Everything between two matches is outside any string, so parentheses there are counted directly.
+_RECORDS = re.compile(
+    rb'(' + _STRING + rb')'
+    rb'|\((?:'
+    rb'((?:footprint|module)(?=[\s)]))'
+    rb'|at\s+(' + _ATOM + rb')\s+(' + _ATOM + rb')'
+    rb'|(?:property\s+"Reference"|fp_text\s+reference)\s+(' + _STRING + rb'|' + _ATOM + rb')'
+    rb')'
+)
+_ESCAPE = re.compile(rb'\\(.)')
+
+
+def _atom(token: bytes) -> str:
+    if token.startswith(b'"'):
+        token = _ESCAPE.sub(rb'\1', token[1:-1])
+    return token.decode("utf-8", errors="replace")
+
+
+def _format_millimetres(value: float) -> bytes:
+    # Whole nanometres like pcbnew, without trailing zeros
+    return f"{int(value * 10**6) / 10**6:.6f}".rstrip("0").rstrip(".").encode()
+
+
+def _scan_region(data: bytes, start: int, end: int, depth: int, component_positions: dict) -> list:
+    # Patches for the top-level footprints in data[start:end], which starts at the given depth.
+    # A footprint's own position and reference are the first ones found directly inside it.
+    patches = []
+    scanned = start
+    footprint, reference, position_spans = False, None, None
+    for match in _RECORDS.finditer(data, start, end):
+        match_start = match.start()
+        depth += data.count(b"(", scanned, match_start) - data.count(b")", scanned, match_start)
+        scanned = match.end()
+        if match.lastindex == 1:
+            continue
+
+        if match.lastindex == 2 and depth == 1:
+            footprint, reference, position_spans = True, None, None
+        elif footprint and depth == 2:
+            if match.lastindex == 4 and position_spans is None:
+                position_spans = match.span(3), match.span(4)
+            elif match.lastindex == 5 and reference is None:
+                reference = _atom(match.group(5))
+
+            if reference is not None and position_spans is not None:
+                if reference in component_positions:
+                    patches.append((position_spans, component_positions[reference]))
+                footprint = False
+        depth += 1
+
+    return patches
+
+
+def _region_patches(data: bytes, region: list, end: int, component_positions: dict) -> list:
+    start, depth, footprint, reference, position_spans = region
+    if footprint and reference is not None and position_spans is not None:
+        return [(position_spans, component_positions[reference])] if reference in component_positions else []
+    if data.find(b"(footprint", start, end) == -1 and data.find(b"(module", start, end) == -1:
+        return []
+    return _scan_region(data, start, end, depth, component_positions)
+
+
+def write_board(source, target, component_positions: dict) -> int:
+    # Copies a .kicad_pcb file between binary files, rewriting only the (at x y) of the top-level
+    # footprints whose reference is in component_positions ({reference: {'x': mm, 'y': mm}}).
+    # Returns the number of moved footprints.
+    if len(component_positions) == 0:
+        shutil.copyfileobj(source, target, CHUNK_SIZE)
+        return 0
+
+    moved = 0
+    top_indent = None
+    buffer = bytearray()
+    # The top-level record being read: start, depth at its start, whether it is a footprint, its reference
+    # and the spans of its x and y. The file header is a region of its own, starting outside the board.
+    region = [0, 0, False, None, None]
+    # Lines before this offset were scanned already, a record spanning many chunks is not rescanned
+    scanned = 0
+    while True:
+        chunk = source.read(CHUNK_SIZE)
+        buffer += chunk
+        end_of_file = chunk == b""
+
+        patches = []
+        scan_end = len(buffer) if end_of_file else max(buffer.rfind(b"\n"), scanned)
+        for match in _LINE.finditer(buffer, scanned, scan_end):
+            indent = match.group(1)
+            if top_indent is None:
+                top_indent = indent
+
+            if len(indent) <= len(top_indent):
+                patches += _region_patches(buffer, region, match.start(), component_positions)
+                region = [match.start(), 1, match.lastindex == 2, None, None]
+            elif region[2] and len(indent) == 2 * len(top_indent):
+                if match.lastindex == 4 and region[4] is None:
+                    region[4] = match.span(3), match.span(4)
+                elif match.lastindex == 5 and region[3] is None:
+                    region[3] = _atom(match.group(5))
+        scanned = scan_end
+
+        if end_of_file:
+            patches += _region_patches(buffer, region, len(buffer), component_positions)
+            cut = len(buffer)
+        else:
+            cut = region[0]
+
+        copied = 0
+        for ((x_start, x_end), (y_start, y_end)), new_position in patches:
+            target.write(buffer[copied:x_start])
+            target.write(_format_millimetres(new_position['x']))
+            target.write(buffer[x_end:y_start])
+            target.write(_format_millimetres(new_position['y']))
+            copied = y_end
+        target.write(buffer[copied:cut])
+        moved += len(patches)
+
+        if end_of_file:
+            return moved
+
+        # The last record may continue in the next chunk, what was found of it so far is kept
+        del buffer[:cut]
+        scanned -= cut
+        if region[4] is not None:
+            region[4] = tuple((start - cut, end - cut) for start, end in region[4])
+        region[0] = 0
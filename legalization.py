@@ -0,0 +1,170 @@
+import heapq
+import itertools
+import math
+
+import numpy as np
+
+
+# Overlaps below the precision positions are written with (1 nm) are ignored
+OVERLAP_TOLERANCE = 1e-6
+
+# Candidate positions tried per box before it is searched for on a grid of growing rings around its
+# position instead. Only crowded placements, with little free space left near a box, get that far.
+LEGALIZATION_MAX_CANDIDATES = 256
+
+# Grid points per ring side searched around a box once the candidates run out, nearer rings are searched fully
+RING_SIDE_SAMPLES = 16
+
+# Grid cells are at least this fraction of the largest box, so no box covers more than this many cells per side
+MAX_CELLS_PER_SIDE = 64
+
+
+def _boxes(positions: dict, dimensions: dict) -> tuple[list, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    names = list(positions)
+    x = np.array([positions[name]['x'] for name in names], dtype=np.float64)
+    y = np.array([positions[name]['y'] for name in names], dtype=np.float64)
+    half_widths = np.array([dimensions[name]['width'] / 2 for name in names], dtype=np.float64)
+    half_heights = np.array([dimensions[name]['height'] / 2 for name in names], dtype=np.float64)
+    return names, x, y, half_widths, half_heights
+
+
+def _cell_size(half_widths: np.ndarray, half_heights: np.ndarray) -> float:
+    # About as large as a typical box. Boxes without a size do not count, they cover a single cell anyway.
+    sizes = 2 * np.maximum(half_widths, half_heights)
+    sizes = sizes[sizes > OVERLAP_TOLERANCE]
+    if len(sizes) == 0:
+        return 1.0
+    return max(float(np.median(sizes)), float(sizes.max()) / MAX_CELLS_PER_SIDE)
+
+
+def _overlapping_pairs(x: np.ndarray, y: np.ndarray, half_widths: np.ndarray, half_heights: np.ndarray) -> np.ndarray:
+    # Boxes are hashed into every cell of a uniform grid they cover, only boxes sharing a cell are compared.
+    # With cells about as large as a typical box that is a few comparisons per box.
+    if len(x) < 2:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    cell = _cell_size(half_widths, half_heights)
+    x0 = np.floor((x - half_widths) / cell).astype(np.int64)
+    x1 = np.floor((x + half_widths) / cell).astype(np.int64)
+    y0 = np.floor((y - half_heights) / cell).astype(np.int64)
+    y1 = np.floor((y + half_heights) / cell).astype(np.int64)
+
+    columns = x1 - x0 + 1
+    counts = columns * (y1 - y0 + 1)
+    boxes = np.repeat(np.arange(len(x)), counts)
+    local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    cell_x = x0[boxes] + local % columns[boxes]
+    cell_y = y0[boxes] + local // columns[boxes]
+
+    order = np.lexsort((boxes, cell_y, cell_x))
+    boxes, cell_x, cell_y = boxes[order], cell_x[order], cell_y[order]
+    starts = np.flatnonzero(np.r_[True, (cell_x[1:] != cell_x[:-1]) | (cell_y[1:] != cell_y[:-1])])
+    ends = np.r_[starts[1:], len(boxes)]
+
+    candidates = [pair for start, end in zip(starts.tolist(), ends.tolist()) if end - start > 1
+                  for pair in itertools.combinations(boxes[start:end].tolist(), 2)]
+    if len(candidates) == 0:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    first, second = np.unique(np.array(candidates, dtype=np.int64), axis=0).T
+    overlapping = ((np.abs(x[first] - x[second]) < half_widths[first] + half_widths[second] - OVERLAP_TOLERANCE) &
+                   (np.abs(y[first] - y[second]) < half_heights[first] + half_heights[second] - OVERLAP_TOLERANCE))
+    return np.stack([first[overlapping], second[overlapping]], axis=1)
+
+
+def find_overlaps(positions: dict, dimensions: dict) -> list[tuple[str, str]]:
+    # Pairs of components whose boxes (centred on their positions, sized like get_component_dimensions) overlap
+    names, x, y, half_widths, half_heights = _boxes(positions, dimensions)
+    return [(names[first], names[second]) for first, second in _overlapping_pairs(x, y, half_widths, half_heights).tolist()]
+
+
+def _ring_search(start_x: float, start_y: float, step_x: float, step_y: float, free) -> tuple[float, float]:
+    # Nearest free position on the first ring of grid points around the start that has one. Far from the
+    # start rings grow by a quarter and are sampled sparsely, so crowded placements stay cheap. Only finitely
+    # many boxes are placed, so some ring is always clear of all of them.
+    ring = 1
+    while True:
+        stride = max(1, math.ceil(2 * ring / RING_SIDE_SAMPLES))
+        sides = list(range(-ring, ring, stride)) + [ring]
+        points = [(i, j) for i in sides for j in (-ring, ring)] + [(i, j) for i in (-ring, ring) for j in sides[1:-1]]
+        points.sort(key=lambda point: (point[0] * step_x) ** 2 + (point[1] * step_y) ** 2)
+        for i, j in points:
+            if free(start_x + i * step_x, start_y + j * step_y):
+                return start_x + i * step_x, start_y + j * step_y
+        ring = max(ring + 1, int(ring * 1.25))
+
+
+def legalize(positions: dict, dimensions: dict) -> tuple[dict, dict]:
+    # Boxes overlapping no other one keep their positions. The others are placed one by one, largest first,
+    # at the free position nearest to where they were: their own if it is still free, otherwise one just
+    # touching a box in the way, trying the closest ones first. A box with no such position found is moved
+    # by whole box sizes in growing rings around its position. This always ends with no box overlapping.
+    names, x, y, half_widths, half_heights = _boxes(positions, dimensions)
+    start_x, start_y = x.copy(), y.copy()
+    pairs = _overlapping_pairs(x, y, half_widths, half_heights)
+
+    overlapping = np.unique(pairs)
+    placed = np.ones(len(names), dtype=bool)
+    placed[overlapping] = False
+    cell = _cell_size(half_widths, half_heights)
+    grid = {}
+
+    # Boxes are placed one at a time, which is faster on plain floats than on numpy scalars
+    xs, ys, widths, heights = x.tolist(), y.tolist(), half_widths.tolist(), half_heights.tolist()
+
+    def cells(index: int, box_x: float, box_y: float):
+        x0, x1 = math.floor((box_x - widths[index]) / cell), math.floor((box_x + widths[index]) / cell)
+        y0, y1 = math.floor((box_y - heights[index]) / cell), math.floor((box_y + heights[index]) / cell)
+        return itertools.product(range(x0, x1 + 1), range(y0, y1 + 1))
+
+    def blockers(index: int, box_x: float, box_y: float, first_only: bool = False) -> set:
+        found = set()
+        for key in cells(index, box_x, box_y):
+            for other in grid.get(key, ()):
+                if (abs(box_x - xs[other]) < widths[index] + widths[other] - OVERLAP_TOLERANCE and
+                        abs(box_y - ys[other]) < heights[index] + heights[other] - OVERLAP_TOLERANCE):
+                    found.add(other)
+                    if first_only:
+                        return found
+        return found
+
+    for index in np.flatnonzero(placed).tolist():
+        for key in cells(index, xs[index], ys[index]):
+            grid.setdefault(key, []).append(index)
+
+    for index in sorted(overlapping.tolist(), key=lambda index: -widths[index] * heights[index]):
+        # Best-first search over candidate positions by distance from the original one
+        origin_x, origin_y = xs[index], ys[index]
+        candidates = [(0.0, origin_x, origin_y)]
+        seen = {(origin_x, origin_y)}
+        for _ in range(LEGALIZATION_MAX_CANDIDATES):
+            _, box_x, box_y = heapq.heappop(candidates)
+            in_the_way = blockers(index, box_x, box_y)
+            if len(in_the_way) == 0:
+                break
+            for other in in_the_way:
+                for candidate in ((xs[other] - widths[other] - widths[index], box_y),
+                                  (xs[other] + widths[other] + widths[index], box_y),
+                                  (box_x, ys[other] - heights[other] - heights[index]),
+                                  (box_x, ys[other] + heights[other] + heights[index])):
+                    if candidate not in seen:
+                        seen.add(candidate)
+                        distance = (candidate[0] - origin_x) ** 2 + (candidate[1] - origin_y) ** 2
+                        heapq.heappush(candidates, (distance, *candidate))
+        else:
+            box_x, box_y = _ring_search(origin_x, origin_y, max(2 * widths[index], cell), max(2 * heights[index], cell),
+                                        lambda box_x, box_y: len(blockers(index, box_x, box_y, True)) == 0)
+
+        xs[index], ys[index] = box_x, box_y
+        for key in cells(index, box_x, box_y):
+            grid.setdefault(key, []).append(index)
+
+    x, y = np.array(xs, dtype=np.float64), np.array(ys, dtype=np.float64)
+    displacements = np.hypot(x - start_x, y - start_y)
+    legalized = {name: {'x': new_x, 'y': new_y} for name, new_x, new_y in zip(names, x.tolist(), y.tolist())}
+    report = {
+        'overlaps': len(pairs),
+        'moved': int(np.count_nonzero(displacements > 0)),
+        'displacement': float(displacements.sum()),
+    }
+    return legalized, report
@@ -0,0 +1,122 @@
+import importlib
+import logging
+import os
+import threading
+
+import profiling
+
+
+logger = logging.getLogger("linkboard.native")
+
+# Parsed by cling the first time OGDF is used
+OGDF_HEADERS = (
+    "ogdf/basic/simple_graph_alg.h",
+    "ogdf/basic/extended_graph_alg.h",
+    "ogdf/planarity/PlanarSubgraphCactus.h",
+    "ogdf/planarity/PlanarizationLayout.h",
+    "ogdf/orthogonal/OrthoLayout.h",
+    "ogdf/layered/SugiyamaLayout.h",
+)
+
+_lock = threading.RLock()
+_modules = {}
+_warm_up_thread = None
+
+
+def _configure_precompiled_header() -> None:
+    # cppyy builds its precompiled standard headers next to the package, which is not writable (and so rebuilt
+    # or skipped in every process) in most deployments. Under the cache directory it is built once and reused.
+    cache_directory = os.environ.get("LINKBOARD_CACHE_DIR")
+    if cache_directory is None or "CLING_STANDARD_PCH" in os.environ:
+        return
+
+    from cppyy_backend._version import __version__
+    directory = os.path.join(cache_directory, "cppyy")
+    os.makedirs(directory, exist_ok=True)
+    os.environ["CLING_STANDARD_PCH"] = os.path.join(directory, f"allDict.cxx.pch.{__version__}")
+
+
+def _load_ogdf():
+    _configure_precompiled_header()
+    from ogdf_python import ogdf, cppinclude
+    for header in OGDF_HEADERS:
+        cppinclude(header)
+    return ogdf
+
+
+def _load_cppyy():
+    _configure_precompiled_header()
+    return importlib.import_module("cppyy")
+
+
+def _load_pcbnew():
+    try:
+        return importlib.import_module("pcbnew")
+    except ImportError:
+        raise RuntimeError("pcbnew is not available, boards can only be read with the sexpr reader") from None
+
+
+_LOADERS = {'ogdf': _load_ogdf, 'cppyy': _load_cppyy, 'pcbnew': _load_pcbnew}
+
+
+def load(name: str):
+    module = _modules.get(name)
+    if module is None:
+        with _lock:
+            module = _modules.get(name)
+            if module is None:
+                with profiling.stage(f"load_{name}"):
+                    module = _LOADERS[name]()
+                _modules[name] = module
+    return module
+
+
+class _LazyModule:
+    # Stands in for a native module and loads it on first attribute access
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    def __getattr__(self, attribute: str):
+        return getattr(load(self._name), attribute)
+
+
+ogdf = _LazyModule("ogdf")
+cppyy = _LazyModule("cppyy")
+pcbnew = _LazyModule("pcbnew")
+
+
+def warm_up() -> None:
+    # Loads OGDF and JIT-compiles the code used by planarity on a tiny graph, then pcbnew when it is installed
+    from graph import Graph
+    from planarity import Planarity
+
+    graph = Graph()
+    for vertex1 in range(5):
+        for vertex2 in range(vertex1 + 1, 5):
+            graph.add_edge(str(vertex1), str(vertex2))
+
+    planar_subgraph, _ = Planarity.max_planar_subgraph_of_connected_graph(graph)
+    dimensions = {vertex: {'width': 1.0, 'height': 1.0} for vertex in graph.get_vertices()}
+    Planarity._compute_layout(planar_subgraph, dimensions, 1.0, 0.4)
+
+    try:
+        load("pcbnew")
+    except RuntimeError:
+        pass
+
+
+def _run_warm_up() -> None:
+    try:
+        warm_up()
+    except Exception:
+        logger.exception("Warm-up failed")
+
+
+def start_warm_up() -> threading.Thread:
+    # At most one background warm-up per process
+    global _warm_up_thread
+    with _lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=_run_warm_up, name="linkboard-warm-up", daemon=True)
+            _warm_up_thread.start()
+    return _warm_up_thread
@@ -1,37 +1,216 @@
-import pcbnew
+import copy
+import io
+import os
+import tempfile
 
-from graph import Graph
+import numpy as np
+from scipy.sparse import coo_matrix, csgraph
+from scipy.spatial import Delaunay, QhullError
+from scipy.spatial.distance import pdist, squareform
+
+import kicad_reader
+import kicad_writer
+import profiling
+from graph import CompactGraph, Graph
+from native import pcbnew
+
+
+# How the pads of a net are linked: in pad order, by a geometric minimum spanning tree,
+# or all to the pad closest to the net centroid
+NET_MODELS = ("chain", "mst", "star")
+
+# pcbnew loads the complete board, sexpr streams the file and keeps only footprints, pads and nets
+READERS = ("pcbnew", "sexpr")
+
+# Nets up to this size get their MST from all pairwise distances, larger ones from the edges of their Delaunay
+# triangulation, which always contain the Euclidean MST
+DENSE_MST_MAX_PADS = 32
+
+# Share of the pads in changed nets above which a board revision rebuilds the graphs instead of updating them.
+# Relinking costs about ten times as much per pad as converting (update_graphs_* against convert_to_graphs_*
+# in the benchmarks), the break-even share was 0.08 to 0.2 depending on the board.
+ECO_REBUILD_SHARE = 0.1
+
+
+def _delaunay_edges(points: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Distinct points only. Collinear ones cannot be triangulated, their MST is the chain in sorted order.
+    if len(points) < 3 or np.linalg.matrix_rank(points - points[0]) < 2:
+        order = np.lexsort((points[:, 1], points[:, 0]))
+        return order[:-1], order[1:]
+
+    # Nearly collinear points can still defeat Qhull, joggling them a little always gives a triangulation
+    try:
+        simplices = Delaunay(points).simplices
+    except QhullError:
+        simplices = Delaunay(points, qhull_options="QJ").simplices
+
+    edges = np.sort(np.concatenate([simplices[:, [0, 1]], simplices[:, [1, 2]], simplices[:, [0, 2]]]), axis=1)
+    edges = np.unique(edges, axis=0)
+    return edges[:, 0], edges[:, 1]
+
+
+def _euclidean_mst(points: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Adding the same constant to every weight keeps the MST unchanged and stops csgraph
+    # from dropping zero-length links between pads at identical positions
+    pads_number = len(points)
+    if pads_number <= DENSE_MST_MAX_PADS:
+        weights = squareform(pdist(points) + 1.0)
+    else:
+        # Pads at the same position as an earlier one are linked to it, the others are triangulated
+        unique_points, first, inverse = np.unique(points, axis=0, return_index=True, return_inverse=True)
+        representatives = first[inverse.ravel()]
+        duplicates = np.flatnonzero(representatives != np.arange(pads_number))
+
+        sources, targets = _delaunay_edges(unique_points)
+        sources = np.concatenate([first[sources], duplicates])
+        targets = np.concatenate([first[targets], representatives[duplicates]])
+        weights = coo_matrix((np.hypot(*(points[sources] - points[targets]).T) + 1.0, (sources, targets)),
+                             shape=(pads_number, pads_number)).tocsr()
+
+    spanning_tree = csgraph.minimum_spanning_tree(weights).tocoo()
+    return spanning_tree.row.astype(np.int64), spanning_tree.col.astype(np.int64)
+
+
+def _block_euclidean_msts(points: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # The MSTs of many small nets at once: their pairwise distances form one block-diagonal matrix, whose
+    # spanning forest has one tree per block. Nets are grouped by size so that each size builds its pairs in one go.
+    sources, targets = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+    for count in np.unique(counts).tolist():
+        rows, columns = np.triu_indices(count, 1)
+        offsets = starts[counts == count][:, None]
+        sources.append((offsets + rows).ravel())
+        targets.append((offsets + columns).ravel())
+    sources, targets = np.concatenate(sources), np.concatenate(targets)
+
+    # As in _euclidean_mst, the constant keeps zero-length links between pads at identical positions
+    weights = coo_matrix((np.hypot(*(points[sources] - points[targets]).T) + 1.0, (sources, targets)),
+                         shape=(len(points), len(points))).tocsr()
+    spanning_forest = csgraph.minimum_spanning_tree(weights).tocoo()
+    return spanning_forest.row.astype(np.int64), spanning_forest.col.astype(np.int64)
+
+
+def _translate_names(names: list, previous_names: list) -> tuple[np.ndarray, list]:
+    # Ids of the names in previous_names, names missing there get ids after its last one. Also returns the names
+    # of all ids.
+    previous_ids = {name: index for index, name in enumerate(previous_names)}
+    all_names = list(previous_names)
+    ids = np.empty(len(names), dtype=np.int64)
+    for index, name in enumerate(names):
+        if name not in previous_ids:
+            previous_ids[name] = len(all_names)
+            all_names.append(name)
+        ids[index] = previous_ids[name]
+    return ids, all_names
+
+
+def _group_by_net(net_ids: np.ndarray, nets_number: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Pads sorted by net (keeping pad order within a net) without those with no known net, with the number
+    # of pads and the position of the first one of every net
+    order = np.argsort(net_ids, kind='stable')
+    order = order[net_ids[order] >= 0]
+    counts = np.bincount(net_ids[order], minlength=nets_number)
+    return counts, np.cumsum(counts) - counts, order
+
+
+def _without(pairs: list, pair: tuple) -> list:
+    index = pairs.index(pair)
+    return pairs[:index] + pairs[index + 1:]
 
 
 class PcbBoard:
-    def __init__(self, name: str):
+    def __init__(self, name: str, net_model: str = "chain"):
+        if net_model not in NET_MODELS:
+            raise ValueError(f"Unknown net model: {net_model}")
+
         self._name = name
+        self._net_model = net_model
+
+    def load_from_file(self, filename: str, reader: str = "pcbnew"):
+        self._read_file(filename, reader)
+        self._source = filename
+        self._positions = {}
+        self._revision = 0
+        self._convert_to_graphs()
 
-    def load_from_file(self, filename: str):
-        self._board = pcbnew.LoadBoard(filename)
-        self._extract_components_pads_nets_connections()
+    def load_from_bytes(self, data: bytes, reader: str = "pcbnew"):
+        self._read_bytes(data, reader)
+        self._source = data
+        self._positions = {}
+        self._revision = 0
         self._convert_to_graphs()
 
+    # ECO: a new revision of a loaded board only updates the links of the nets whose pads changed,
+    # the graphs are updated in place and everything else about them is kept
+    def update_from_file(self, filename: str, reader: str = "pcbnew") -> dict:
+        previous = copy.copy(self)
+        self._read_file(filename, reader)
+        self._source = filename
+        self._positions = {}
+        return self._update_graphs(previous)
+
+    def update_from_bytes(self, data: bytes, reader: str = "pcbnew") -> dict:
+        previous = copy.copy(self)
+        self._read_bytes(data, reader)
+        self._source = data
+        self._positions = {}
+        return self._update_graphs(previous)
+
+    def clone(self) -> "PcbBoard":
+        # A board with graphs of its own, so a new revision can be applied to it without touching this one
+        board = copy.copy(self)
+        board._components_graph = Graph.copy(self._components_graph)
+        board._pads_graph = Graph.copy(self._pads_graph)
+        board._positions = dict(self._positions)
+        return board
+
+    # Boards are written by patching the positions of moved footprints into the original file,
+    # the rest of it is copied unchanged
+    @profiling.timed("save_board")
     def save_to_file(self, filename: str):
-        self._board.Save(filename)
+        # Through a temporary file, so the source board itself can be overwritten
+        temp_filename = filename + ".tmp"
+        with open(temp_filename, "wb") as file:
+            self._write_board(file)
+        os.replace(temp_filename, filename)
+
+    @profiling.timed("save_board")
+    def save_to_bytes(self) -> bytes:
+        with io.BytesIO() as file:
+            self._write_board(file)
+            return file.getvalue()
 
     def get_name(self):
         return self._name
+
+    def get_revision(self):
+        return self._revision
+
+    def get_net_model(self):
+        return self._net_model
     
     def get_components(self):
-        return self._components
+        return list(self._component_names)
     
     def get_pads(self):
-        return self._pads
+        return list(zip(self._get_pad_names(), zip(self._pad_x.tolist(), self._pad_y.tolist())))
     
     def get_aggregated_pads(self):
-        return self._aggregated_pads
+        aggregated_pads = {}
+        for pad_name, component_id in zip(self._get_pad_names(), self._pad_component_ids.tolist()):
+            aggregated_pads.setdefault(self._component_names[component_id], []).append(pad_name)
+        return aggregated_pads
 
     def get_nets(self):
-        return self._nets
+        return list(self._net_names)
     
     def get_connections(self):
-        return self._connections
+        order = np.argsort(self._pad_net_ids, kind='stable')
+        net_ids, starts = np.unique(self._pad_net_ids[order], return_index=True)
+        groups = np.split(order, starts[1:])
+        pad_names = self._get_pad_names()
+
+        return {self._net_names[net_id]: [pad_names[index] for index in group.tolist()]
+                for net_id, group in zip(net_ids.tolist(), groups) if net_id >= 0}
     
     def get_components_graph(self) -> Graph:
         return self._components_graph
@@ -45,104 +224,341 @@ class PcbBoard:
     def get_edge_net_pads_lookup(self):
         return self._edge_net_pads_lookup
     
-    def get_component_dimensions(self):
-        return {component: self._get_component_dimensions(component, 1.0) for component in self._components}
+    def get_component_dimensions(self, padding: float = 1.0):
+        return {
+            component: {
+                'width': width / 10**6 + 2 * padding,
+                'height': height / 10**6 + 2 * padding
+            }
+            for component, width, height in zip(self._component_names, self._component_widths.tolist(), self._component_heights.tolist())
+        }
     
     def update_component_positions(self, component_positions: dict):
-        for footprint in self._board.Footprints():
-            footprint_name = self._get_footprint_name(footprint)
-            if footprint_name in component_positions:
-                pos = component_positions[footprint_name]
-                point = pcbnew.VECTOR2I(int(pos['x'] * 10**6), int(pos['y'] * 10**6))
-                footprint.SetPosition(point)
+        self._positions.update(component_positions)
+
+    def _load_pcbnew_board(self, filename: str):
+        with profiling.stage("pcbnew.LoadBoard"):
+            return pcbnew.LoadBoard(filename)
+
+    def _read_file(self, filename: str, reader: str):
+        if reader not in READERS:
+            raise ValueError(f"Unknown board reader: {reader}")
+
+        if reader == "pcbnew":
+            self._board = self._load_pcbnew_board(filename)
+            self._extract_components_pads_nets_connections()
+        else:
+            with open(filename, "rb") as file:
+                self._read_kicad_file(file)
+            self._board = None
+
+    def _read_bytes(self, data: bytes, reader: str):
+        if reader not in READERS:
+            raise ValueError(f"Unknown board reader: {reader}")
+
+        if reader == "pcbnew":
+            # pcbnew can only load from a path, so go through a private temporary directory
+            with tempfile.TemporaryDirectory() as directory:
+                filename = os.path.join(directory, "board.kicad_pcb")
+                with open(filename, "wb") as file:
+                    file.write(data)
+                self._read_file(filename, reader)
+        else:
+            self._read_kicad_file(io.BytesIO(data))
+            self._board = None
 
+    def _write_board(self, target):
+        source = io.BytesIO(self._source) if isinstance(self._source, bytes) else open(self._source, "rb")
+        with source:
+            kicad_writer.write_board(source, target, self._positions)
+
+    @profiling.timed("read_kicad_file")
+    def _read_kicad_file(self, file):
+        footprints, nets = kicad_reader.read_board(file)
+        self._build_pad_table(footprints, nets)
+
+    @profiling.timed("extract_components_pads_nets")
     def _extract_components_pads_nets_connections(self):
-        self._components = []
-        self._pads = []
-        self._aggregated_pads = {}
-        self._nets = []
-        self._connections = {}
+        nets = {net.GetNetCode(): net.GetNetname() for net in self._board.GetNetsByName().values()}
+        footprints = (
+            (self._get_footprint_name(footprint),
+             [(pad.GetPadName(), pad.GetNetCode(), pad.GetPosition()) for pad in footprint.Pads()])
+            for footprint in self._board.Footprints()
+        )
+        self._build_pad_table(footprints, nets)
+
+    # footprints: iterable of (footprint name, [(pad number, net code, position), ...])
+    # nets: net code -> net name
+    def _build_pad_table(self, footprints, nets: dict):
+        self._component_names = []
+        self._net_names = list(nets.values())
+        self._pad_numbers = []
+
+        component_ids = {}
+        net_ids = {code: index for index, code in enumerate(nets)}
+        pad_number_ids = {}
+        pad_component_ids, pad_ids, pad_net_ids, pad_x, pad_y = [], [], [], [], []
+
+        for footprint_name, pads in footprints:
+            if footprint_name not in component_ids:
+                component_ids[footprint_name] = len(self._component_names)
+                self._component_names.append(footprint_name)
+            component_id = component_ids[footprint_name]
 
-        for footprint in self._board.Footprints():
-            footprint_name = self._get_footprint_name(footprint)
-            self._components.append(footprint_name)
+            for pad_number, net_code, pad_pos in pads:
+                if pad_number not in pad_number_ids:
+                    pad_number_ids[pad_number] = len(self._pad_numbers)
+                    self._pad_numbers.append(pad_number)
 
-            for pad in footprint.Pads():
-                pad_name = self._get_pad_name(pad)
-                pad_pos = pad.GetPosition()
-                self._pads.append((pad_name, (pad_pos.x, pad_pos.y)))
-                if footprint_name not in self._aggregated_pads:
-                    self._aggregated_pads[footprint_name] = []
-                self._aggregated_pads[footprint_name].append(pad_name)
+                pad_component_ids.append(component_id)
+                pad_ids.append(pad_number_ids[pad_number])
+                pad_net_ids.append(net_ids.get(net_code, -1))
+                pad_x.append(pad_pos.x)
+                pad_y.append(pad_pos.y)
 
-            self._nets = [net.GetNetname() for net in self._board.GetNetsByName().values()]
+        self._pad_component_ids = np.array(pad_component_ids, dtype=np.int32)
+        self._pad_ids = np.array(pad_ids, dtype=np.int32)
+        self._pad_net_ids = np.array(pad_net_ids, dtype=np.int32)
+        self._pad_x = np.array(pad_x, dtype=np.int64)
+        self._pad_y = np.array(pad_y, dtype=np.int64)
 
-        for net in self._nets:
-            self._connections[net] = []
+        self._compute_component_extents()
 
-            for footprint in self._board.Footprints():
-                for pad in footprint.Pads():
-                    if pad.GetNet().GetNetname() == net:
-                        self._connections[net].append(self._get_pad_name(pad))
+    def _compute_component_extents(self):
+        # Group-by over component ids: per-component bounding box of the pad positions
+        components_number = len(self._component_names)
+        ids = self._pad_component_ids
+        min_x = np.full(components_number, np.iinfo(np.int64).max)
+        max_x = np.full(components_number, np.iinfo(np.int64).min)
+        min_y = np.full(components_number, np.iinfo(np.int64).max)
+        max_y = np.full(components_number, np.iinfo(np.int64).min)
+        np.minimum.at(min_x, ids, self._pad_x)
+        np.maximum.at(max_x, ids, self._pad_x)
+        np.minimum.at(min_y, ids, self._pad_y)
+        np.maximum.at(max_y, ids, self._pad_y)
 
-            if len(self._connections[net]) == 0:
-                del self._connections[net]
+        has_pads = np.bincount(ids, minlength=components_number) > 0
+        self._component_widths = np.where(has_pads, max_x - min_x, 0)
+        self._component_heights = np.where(has_pads, max_y - min_y, 0)
 
+    @profiling.timed("convert_to_graphs")
     def _convert_to_graphs(self):
         self._components_graph = Graph()
-        self._pads_graph = Graph()
 
-        # Create nodes in the general and detailed graphs for each pad
-        for footprint in self._board.Footprints():
-            footprint_name = self._get_footprint_name(footprint)
+        # Create nodes in the general graph for each component
+        for footprint_name in self._component_names:
             self._components_graph.add_vertex(footprint_name)
 
-            for pad in footprint.Pads():
-                pad_name = self._get_pad_name(pad)
-                self._pads_graph.add_vertex(pad_name)
+        # Link the pads of every net according to the net model, skipping links inside a single component
+        src, dst = self._get_net_links()
+        component_ids = self._pad_component_ids
+        linked = component_ids[src] != component_ids[dst]
+        src, dst = src[linked], dst[linked]
+
+        pad_names = self._get_pad_names()
 
         # Create edges in the general graph between connected components
-        for conn in self._connections.values():
-            for index in range(1, len(conn)):
-                src = conn[index - 1]
-                dst = conn[index]
-
-                src_comp = self._extract_component_name(src)
-                dst_comp = self._extract_component_name(dst)
-
-                if src_comp == dst_comp:
-                    continue
-                
-                if not self._components_graph.edge_exists(src_comp, dst_comp):
-                    self._components_graph.add_edge(src_comp, dst_comp, [(src, dst)])
-                else:
-                    self._components_graph.update_edge(src_comp, dst_comp, lambda properties: properties + [(src, dst)])
-
-                if not self._pads_graph.edge_exists(src, dst):
-                    self._pads_graph.add_edge(src, dst, 1)
-                else:
-                    self._pads_graph.update_edge(src, dst, lambda x: x + 1)
-
-    def _get_footprint_name(self, footprint: pcbnew.FOOTPRINT) -> str:
-        return footprint.GetReference()
+        for src_pad, dst_pad, src_comp_id, dst_comp_id in zip(src.tolist(), dst.tolist(), component_ids[src].tolist(), component_ids[dst].tolist()):
+            src_comp = self._component_names[src_comp_id]
+            dst_comp = self._component_names[dst_comp_id]
+            pads_pair = (pad_names[src_pad], pad_names[dst_pad])
 
-    def _get_pad_name(self, pad: pcbnew.PAD) -> str:
-        return pad.GetParentAsString() + "@" + pad.GetPadName()
-    
-    def _extract_component_name(self, pad_name: str) -> str:
-        return pad_name.split("@")[0]
-    
-    def _get_component_dimensions(self, component: str, padding: float):
-        component_pads = [pad for pad in self._pads if pad[0].startswith(f"{component}@")]
-        pad_x_positions = [pad[1][0] for pad in component_pads]
-        pad_y_positions = [pad[1][1] for pad in component_pads]
+            if not self._components_graph.edge_exists(src_comp, dst_comp):
+                self._components_graph.add_edge(src_comp, dst_comp, [pads_pair])
+            else:
+                self._components_graph.update_edge(src_comp, dst_comp, lambda properties: properties + [pads_pair])
+
+        # Create the detailed graph in bulk, pads sharing a name are a single vertex
+        vertex_ids = {}
+        pad_vertex_ids = np.array([vertex_ids.setdefault(pad_name, len(vertex_ids)) for pad_name in pad_names], dtype=np.int64)
+        src, dst = pad_vertex_ids[src], pad_vertex_ids[dst]
+        keys, counts = np.unique(np.minimum(src, dst) * len(vertex_ids) + np.maximum(src, dst), return_counts=True)
+
+        self._pads_graph = CompactGraph.from_edges(
+            list(vertex_ids),
+            keys // max(len(vertex_ids), 1),
+            keys % max(len(vertex_ids), 1),
+            counts.tolist()
+        )
+
+    def _get_net_links(self, pads: np.ndarray = None) -> tuple[np.ndarray, np.ndarray]:
+        # Pads sorted by net (keeping pad order within a net), pads without a known net are left out.
+        # pads optionally selects the pads to link, it has to select whole nets.
+        order = np.argsort(self._pad_net_ids, kind='stable')
+        order = order[self._pad_net_ids[order] >= 0]
+        if pads is not None:
+            order = order[pads[order]]
+        net_ids = self._pad_net_ids[order]
+
+        if self._net_model == "chain":
+            same_net = net_ids[:-1] == net_ids[1:]
+            return order[:-1][same_net], order[1:][same_net]
+
+        starts = np.flatnonzero(np.r_[True, net_ids[1:] != net_ids[:-1]]) if len(order) > 0 else np.zeros(0, dtype=np.int64)
+        counts = np.diff(np.r_[starts, len(order)])
+        points = np.stack([self._pad_x[order], self._pad_y[order]], axis=1).astype(np.float64)
+
+        if self._net_model == "star":
+            groups = np.repeat(np.arange(len(starts)), counts)
+            centroids = np.add.reduceat(points, starts, axis=0) / counts[:, None] if len(starts) > 0 else points
+            distances = ((points - centroids[groups]) ** 2).sum(axis=1)
+
+            # Within each net the pad closest to the centroid comes first
+            hubs = np.lexsort((distances, groups))[starts]
+            spokes = np.arange(len(order)) != hubs[groups]
+            return order[hubs[groups][spokes]], order[spokes]
+
+        # Two-pad nets are linked directly, nets up to DENSE_MST_MAX_PADS pads share a single spanning forest
+        # and only larger ones get a spanning tree of their own
+        pairs = starts[counts == 2]
+        sources, targets = [order[pairs]], [order[pairs + 1]]
+        small = (counts >= 3) & (counts <= DENSE_MST_MAX_PADS)
+        if small.any():
+            tree_sources, tree_targets = _block_euclidean_msts(points, starts[small], counts[small])
+            sources.append(order[tree_sources])
+            targets.append(order[tree_targets])
+
+        for start, count in zip(starts.tolist(), counts.tolist()):
+            if count <= DENSE_MST_MAX_PADS:
+                continue
+            tree_sources, tree_targets = _euclidean_mst(points[start:start + count])
+            sources.append(order[start + tree_sources])
+            targets.append(order[start + tree_targets])
+
+        return np.concatenate(sources), np.concatenate(targets)
 
-        min_x = min(pad_x_positions) if len(pad_x_positions) > 0 else 0
-        max_x = max(pad_x_positions) if len(pad_x_positions) > 0 else 0
-        min_y = min(pad_y_positions) if len(pad_y_positions) > 0 else 0
-        max_y = max(pad_y_positions) if len(pad_y_positions) > 0 else 0
+    @profiling.timed("update_graphs")
+    def _update_graphs(self, previous: "PcbBoard") -> dict:
+        # Nets are matched by name. One whose pads (and their positions, unless pads are chained) differ from
+        # the previous revision gets its links removed and linked again, all other links stay as they are.
+        diff = self._diff_pad_tables(previous)
+        changed_nets = {diff['net_names'][net_id] for net_id in diff['changed_nets'].tolist()}
+
+        # Relinking most of the board one link at a time is slower than converting it again
+        rebuilt = diff['changed_pads'] > ECO_REBUILD_SHARE * (len(self._pad_net_ids) + len(previous._pad_net_ids))
+        if rebuilt:
+            self._convert_to_graphs()
+        else:
+            self._relink_nets(previous, changed_nets, diff)
+        self._revision += 1
+
+        return {
+            'changed_nets': sorted(changed_nets),
+            'added_components': sorted(diff['added_components']),
+            'removed_components': sorted(diff['removed_components']),
+            'rebuilt': rebuilt,
+        }
+
+    def _diff_pad_tables(self, previous: "PcbBoard") -> dict:
+        # Both pad tables are brought to the ids of the previous revision (names it does not know get new ids after
+        # its own), so the revisions are compared column by column. Only the name lists are looked at in Python.
+        component_ids, component_names = _translate_names(self._component_names, previous._component_names)
+        pad_ids, pad_numbers = _translate_names(self._pad_numbers, previous._pad_numbers)
+        net_ids, net_names = _translate_names(self._net_names, previous._net_names)
+        columns = [
+            np.append(net_ids, -1)[self._pad_net_ids],
+            component_ids[self._pad_component_ids],
+            pad_ids[self._pad_ids]
+        ]
+        previous_columns = [previous._pad_net_ids, previous._pad_component_ids, previous._pad_ids]
+        if self._net_model != "chain":
+            columns += [self._pad_x, self._pad_y]
+            previous_columns += [previous._pad_x, previous._pad_y]
+
+        # Pads of every net in pad order, a net is unchanged if it has as many pads as before, equal in every column
+        nets_number = len(net_names)
+        counts, starts, order = _group_by_net(columns[0], nets_number)
+        previous_counts, previous_starts, previous_order = _group_by_net(previous_columns[0], nets_number)
+
+        compared = np.flatnonzero((counts == previous_counts) & (counts > 0))
+        compared_counts = counts[compared]
+        groups = np.repeat(np.arange(len(compared)), compared_counts)
+        offsets = np.arange(len(groups)) - np.repeat(np.cumsum(compared_counts) - compared_counts, compared_counts)
+        pads = order[starts[compared][groups] + offsets]
+        previous_pads = previous_order[previous_starts[compared][groups] + offsets]
+        differs = np.zeros(len(groups), dtype=bool)
+        for column, previous_column in zip(columns[1:], previous_columns[1:]):
+            differs |= column[pads] != previous_column[previous_pads]
+
+        changed = counts != previous_counts
+        changed[compared] = np.bincount(groups, weights=differs, minlength=len(compared)) > 0
+
+        # Pads are vertices by component and pad number
+        pad_keys = columns[1] * len(pad_numbers) + columns[2]
+        previous_pad_keys = previous._pad_component_ids.astype(np.int64) * len(pad_numbers) + previous._pad_ids
 
         return {
-            'width': (max_x - min_x) / 10**6  + 2 * padding,
-            'height': (max_y - min_y) / 10**6  + 2 * padding
-        }
\ No newline at end of file
+            'net_names': net_names,
+            'changed_nets': np.flatnonzero(changed),
+            'changed_pads': int(counts[changed].sum() + previous_counts[changed].sum()),
+            'added_components': [component_names[component_id] for component_id in component_ids.tolist()
+                                 if component_id >= len(previous._component_names)],
+            'removed_components': [previous._component_names[component_id] for component_id in
+                                   np.setdiff1d(np.arange(len(previous._component_names)), component_ids).tolist()],
+            'added_pads': np.flatnonzero(~np.isin(pad_keys, previous_pad_keys)),
+            'removed_pads': np.flatnonzero(~np.isin(previous_pad_keys, pad_keys)),
+        }
+
+    def _relink_nets(self, previous: "PcbBoard", nets: set, diff: dict):
+        removed_links = previous._get_named_links(nets)
+        added_links = self._get_named_links(nets)
+
+        # Removals first, so the pads graph rebuilds its adjacency only once, on the next query
+        for src_comp, dst_comp, src_pad, dst_pad in removed_links:
+            pads_pair = (src_pad, dst_pad)
+            self._components_graph.update_edge(src_comp, dst_comp, lambda properties: _without(properties, pads_pair))
+            if len(self._components_graph.get_edge_properties(src_comp, dst_comp)) == 0:
+                self._components_graph.remove_edge(src_comp, dst_comp)
+
+            self._pads_graph.update_edge(src_pad, dst_pad, lambda count: count - 1)
+            if self._pads_graph.get_edge_properties(src_pad, dst_pad) == 0:
+                self._pads_graph.remove_edge(src_pad, dst_pad)
+
+        for component in diff['removed_components']:
+            self._components_graph.remove_vertex(component)
+        for pad in previous._get_pad_names(diff['removed_pads']):
+            self._pads_graph.remove_vertex(pad)
+        for component in diff['added_components']:
+            self._components_graph.add_vertex(component)
+        for pad in self._get_pad_names(diff['added_pads']):
+            self._pads_graph.add_vertex(pad)
+
+        for src_comp, dst_comp, src_pad, dst_pad in added_links:
+            pads_pair = (src_pad, dst_pad)
+            if not self._components_graph.edge_exists(src_comp, dst_comp):
+                self._components_graph.add_edge(src_comp, dst_comp, [pads_pair])
+            else:
+                self._components_graph.update_edge(src_comp, dst_comp, lambda properties: properties + [pads_pair])
+
+            if not self._pads_graph.edge_exists(src_pad, dst_pad):
+                self._pads_graph.add_edge(src_pad, dst_pad, 1)
+            else:
+                self._pads_graph.update_edge(src_pad, dst_pad, lambda count: count + 1)
+
+    def _get_named_links(self, nets: set) -> list:
+        # Links between different components within the given nets: (component, component, pad, pad)
+        selected_nets = np.array([net in nets for net in self._net_names] + [False], dtype=bool)
+        src, dst = self._get_net_links(selected_nets[self._pad_net_ids])
+        component_ids = self._pad_component_ids
+        linked = component_ids[src] != component_ids[dst]
+        src, dst = src[linked], dst[linked]
+
+        links = []
+        for src_pad, dst_pad in zip(src.tolist(), dst.tolist()):
+            src_comp = self._component_names[component_ids[src_pad]]
+            dst_comp = self._component_names[component_ids[dst_pad]]
+            links.append((src_comp, dst_comp,
+                          src_comp + "@" + self._pad_numbers[self._pad_ids[src_pad]],
+                          dst_comp + "@" + self._pad_numbers[self._pad_ids[dst_pad]]))
+        return links
+
+    def _get_footprint_name(self, footprint: "pcbnew.FOOTPRINT") -> str:
+        return footprint.GetReference()
+
+    def _get_pad_names(self, pads: np.ndarray = None) -> list:
+        # pads optionally selects the pads (by index) to name
+        component_ids, pad_ids = self._pad_component_ids, self._pad_ids
+        if pads is not None:
+            component_ids, pad_ids = component_ids[pads], pad_ids[pads]
+        return [self._component_names[component_id] + "@" + self._pad_numbers[pad_id]
+                for component_id, pad_id in zip(component_ids.tolist(), pad_ids.tolist())]
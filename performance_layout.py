@@ -0,0 +1,41 @@
+import streamlit as st
+
+from jobs import Job
+from planarity import Planarity
+from profiling import ProfileCapture, Recorder
+
+
+def _stage_rows(recorder: Recorder) -> list:
+    return [
+        {
+            'Stage': stats['stage'],
+            'Calls': stats['calls'],
+            'Wall time [s]': round(stats['seconds'], 4),
+            'Peak memory [MB]': round(stats['peak_memory'] / 2**20, 2)
+        }
+        for stats in recorder.as_rows()
+    ]
+
+
+def performance_layout(recorder: Recorder, profile: ProfileCapture, st: st, job: Job = None) -> None:
+    st.subheader("Performance")
+
+    rows = _stage_rows(recorder)
+    if len(rows) > 0:
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+    else:
+        st.write("No instrumented stage ran in this request.")
+
+    # The layout build runs in the background, its stages are shown once its result is delivered
+    if job is not None and job.done() and job.result is not None:
+        st.write("Last layout build:")
+        st.dataframe(_stage_rows(job.recorder), use_container_width=True, hide_index=True)
+
+    layout_cache = Planarity.layout_cache_stats()
+    st.write(f"Layout cache: {layout_cache['hits']} hits, {layout_cache['misses']} misses, {layout_cache['entries']} entries")
+
+    if profile.stats_text is not None:
+        with st.expander("cProfile (cumulative)"):
+            st.code(profile.stats_text)
+        with st.expander("tracemalloc (top allocations)"):
+            st.code(profile.memory_text)
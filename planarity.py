@@ -1,12 +1,118 @@
-from ogdf_python import ogdf, cppinclude
-from graph import Graph
+import hashlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
 
-cppinclude("ogdf/basic/simple_graph_alg.h")
-cppinclude("ogdf/basic/extended_graph_alg.h")
-cppinclude("ogdf/planarity/PlanarSubgraphCactus.h")
-cppinclude("ogdf/planarity/PlanarizationLayout.h")
-cppinclude("ogdf/orthogonal/OrthoLayout.h")
-cppinclude("ogdf/layered/SugiyamaLayout.h")
+import profiling
+from cache import LruCache
+from graph import BoundGraph, Graph
+from native import cppyy, ogdf
+
+# Less work than this (in edges) is planarized in-process, shipping it to a worker costs more than it saves
+PARALLEL_MIN_EDGES = 500
+
+_executors = {}
+_manager = None
+
+# Seconds between two cancellation checks while waiting for planarization in the pool
+CHECK_INTERVAL = 0.2
+
+# Bump when the decomposition algorithm changes, so stale on-disk results are not reused
+DECOMPOSITION_CACHE_VERSION = 1
+
+_cache_directory = os.environ.get("LINKBOARD_CACHE_DIR")
+_decomposition_cache = LruCache(
+    max_entries=32,
+    directory=os.path.join(_cache_directory, "decompositions") if _cache_directory else None
+)
+
+# Maximal planar subgraphs of single connected components, sized by a rough per-edge cost
+_component_cache = LruCache(
+    max_entries=4096,
+    max_bytes=32 * 2**20,
+    sizeof=lambda result: 200 * (len(result[0]) + len(result[1]))
+)
+
+LAYOUT_CACHE_BYTES = 64 * 2**20
+
+# Layouts are sized by their SVG plus a rough per-node cost of the embedding
+_layout_cache = LruCache(
+    max_entries=256,
+    max_bytes=LAYOUT_CACHE_BYTES,
+    sizeof=lambda layout: len(layout[1]) + 200 * len(layout[0])
+)
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    # Workers are spawned rather than forked, forking a process with a live cppyy/OGDF state is not safe
+    if workers not in _executors:
+        _executors[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return _executors[workers]
+
+
+class Cancelled(Exception):
+    pass
+
+
+def _get_manager():
+    # Holds the events through which pool workers learn that the caller stopped waiting for them
+    global _manager
+    if _manager is None:
+        _manager = multiprocessing.get_context("spawn").Manager()
+    return _manager
+
+
+def _cancellation_check(cancelled):
+    # Asking the manager is a round trip to another process, so it is asked at most once per CHECK_INTERVAL
+    last_check = float("-inf")
+
+    def check():
+        nonlocal last_check
+        if time.perf_counter() - last_check >= CHECK_INTERVAL:
+            last_check = time.perf_counter()
+            if cancelled.is_set():
+                raise Cancelled()
+
+    return check
+
+
+def _planarize_components(components: list, check=None, cancelled=None) -> list[tuple[list, list]]:
+    # components is a list of (vertices, edges), so that many small ones can share a single task. In a pool
+    # worker, cancelled is a manager event that stops the work once set.
+    if cancelled is not None:
+        check = _cancellation_check(cancelled)
+    results = []
+    for vertices, edges in components:
+        if check is not None:
+            check()
+        component = Graph()
+        for vertex in vertices:
+            component.add_vertex(vertex)
+        for vertex1, vertex2 in edges:
+            component.add_edge(vertex1, vertex2)
+
+        max_planar_subgraph, remaining_graph = Planarity.max_planar_subgraph_of_connected_graph(component, check)
+        results.append((max_planar_subgraph.get_edges(), remaining_graph.get_edges()))
+    return results
+
+
+def _complete_graph_thickness(vertices_number: int) -> int:
+    # Thickness of the complete graph on that many vertices, which bounds every graph of that size
+    if vertices_number in (9, 10):
+        return 3
+    return (vertices_number + 7) // 6
+
+
+def _decomposition_key(graph: Graph) -> str:
+    return f"v{DECOMPOSITION_CACHE_VERSION}-{Graph.fingerprint(graph)}"
+
+
+def _store_decomposition(key: str, subgraphs: list) -> list:
+    layers = [(subgraph.get_vertices(), subgraph.get_edges()) 
+              for subgraph in sorted(subgraphs, key=lambda x: x.get_edges_number(), reverse=True)]
+    _decomposition_cache.put(key, layers)
+    return layers
 
 
 class Planarity:    
@@ -14,9 +120,11 @@ class Planarity:
         ogdf_graph, _ = Graph.to_ogdf_graph(graph)
         return ogdf.isPlanar(ogdf_graph)
     
-    def max_planar_subgraph_of_connected_graph(graph: Graph) -> tuple[Graph, Graph]:
-        ogdf_graph, mapping = Graph.to_ogdf_graph(graph)
-        reversed_mapping = {node: vertex for vertex, node in mapping.items()}
+    def max_planar_subgraph_of_connected_graph(graph: Graph, check=None) -> tuple[Graph, Graph]:
+        # The subgraph is grown on a bound copy, edges are removed and re-inserted on both sides at once.
+        # check, when given, is called before every re-inserted batch and may raise to stop.
+        planar_graph = BoundGraph.from_graph(graph)
+        ogdf_graph = planar_graph.get_ogdf_graph()
 
         psc = ogdf.PlanarSubgraphCactus['float']()
         costs = ogdf.EdgeArray['float'](ogdf_graph)
@@ -28,63 +136,248 @@ class Planarity:
 
         psc.call(ogdf_graph, costs, preferred_edges, del_edges, False)
 
-        graph_copy = Graph.copy(graph)
+        # Read the deleted edges (most expensive first) before their handles are invalidated
+        deleted_edges = [planar_graph.get_ogdf_edge_vertices(edge) for edge in 
+                         sorted(del_edges, key=lambda e: costs[e], reverse=True)]
+
         remaining_graph = Graph()
-        for edge in del_edges:
-            ogdf_graph.delEdge(edge)
-            graph_copy.remove_edge(reversed_mapping[edge.source()], reversed_mapping[edge.target()])
-            remaining_graph.add_edge(reversed_mapping[edge.source()], reversed_mapping[edge.target()])
-
-        max_edges = 3 * graph_copy.get_edges_number() - 6
-        sorted_del_edges = [(edge.source(), edge.target()) for edge in 
-                            sorted(del_edges, key=lambda e: costs[e], reverse=True)]
-        
-        for edge in sorted_del_edges:
-            ne = ogdf_graph.newEdge(edge[0], edge[1])
-            if not ogdf.isPlanar(ogdf_graph):
-                ogdf_graph.delEdge(ne)
-            else:
-                graph_copy.add_edge(reversed_mapping[edge[0]], reversed_mapping[edge[1]])
-                remaining_graph.remove_edge(reversed_mapping[edge[0]], reversed_mapping[edge[1]])
+        for vertex1, vertex2 in deleted_edges:
+            planar_graph.remove_edge(vertex1, vertex2)
+            remaining_graph.add_edge(vertex1, vertex2, graph.get_edge_properties(vertex1, vertex2))
 
-                if graph_copy.get_edges_number() > max_edges:
-                    break
+        # Greedy re-insertion in batches: a batch that stays planar is accepted at once and after two planar
+        # batches in a row the batch size doubles, a non-planar batch is retried at half the size. Edges are
+        # accepted exactly as with one-by-one insertion, but long planar runs cost only a few planarity tests.
+        max_edges = 3 * planar_graph.get_vertices_number() - 6
+        edges_number = planar_graph.get_edges_number()
+        index, batch_size, planar_streak = 0, 1, 0
+        while index < len(deleted_edges) and edges_number < max_edges:
+            if check is not None:
+                check()
+            batch = deleted_edges[index:index + batch_size]
+            for vertex1, vertex2 in batch:
+                planar_graph.add_edge(vertex1, vertex2, remaining_graph.get_edge_properties(vertex1, vertex2))
 
-        return graph_copy, remaining_graph
+            if ogdf.isPlanar(ogdf_graph):
+                for vertex1, vertex2 in batch:
+                    remaining_graph.remove_edge(vertex1, vertex2)
+                index += len(batch)
+                edges_number += len(batch)
+                planar_streak += 1
+                if planar_streak >= 2:
+                    batch_size *= 2
+            else:
+                for vertex1, vertex2 in batch:
+                    planar_graph.remove_edge(vertex1, vertex2)
+                planar_streak = 0
+                if batch_size == 1:
+                    index += 1
+                else:
+                    batch_size //= 2
+
+        return planar_graph, remaining_graph
     
-    def max_planar_subgraph(graph: Graph) -> tuple[Graph, Graph]:
-        connected_components = Graph.connected_components(graph)
+    def max_planar_subgraph(graph: Graph, workers: int = None, check=None) -> tuple[Graph, Graph]:
+        # check, when given, is called between components (and while waiting for the pool) and may raise to stop,
+        # the chunks running in the pool then stop at their next re-inserted batch
+        workers = workers or os.cpu_count() or 1
+        components = [component for component in Graph.connected_components(graph) if component.get_edges_number() > 0]
+
+        # Components seen before (e.g. the unchanged part of a new board revision) are not planarized again
+        keys = [_decomposition_key(component) for component in components]
+        results = [_component_cache.get(key) for key in keys]
+        missing = [index for index, result in enumerate(results) if result is None]
+        sizes = {index: components[index].get_edges_number() for index in missing}
+
+        # Missing components are packed into one chunk per worker, balanced by edges, so boards made of many
+        # small sub-circuits are spread over the pool as well
+        chunks = [missing]
+        if workers > 1 and len(missing) > 1 and sum(sizes.values()) >= PARALLEL_MIN_EDGES:
+            chunks = [[] for _ in range(min(workers, len(missing)))]
+            loads = [0] * len(chunks)
+            for index in sorted(missing, key=lambda index: -sizes[index]):
+                lightest = loads.index(min(loads))
+                chunks[lightest].append(index)
+                loads[lightest] += sizes[index]
+
+        def arguments(chunk: list) -> list:
+            return [(components[index].get_vertices(), components[index].get_edges()) for index in chunk]
+
+        if len(chunks) == 1:
+            for index, result in zip(missing, _planarize_components(arguments(missing), check)):
+                results[index] = result
+        else:
+            cancelled = _get_manager().Event() if check is not None else None
+            futures = [(chunk, _get_executor(workers).submit(_planarize_components, arguments(chunk), None, cancelled))
+                       for chunk in chunks]
+            try:
+                for chunk, future in futures:
+                    # Polled with wait, future.result raises concurrent.futures.TimeoutError, which before
+                    # Python 3.11 is not the builtin TimeoutError
+                    while not future.done():
+                        if check is not None:
+                            check()
+                        wait([future], timeout=CHECK_INTERVAL)
+                    for index, result in zip(chunk, future.result()):
+                        results[index] = result
+            except BaseException:
+                if cancelled is not None:
+                    cancelled.set()
+                for _, future in futures:
+                    future.cancel()
+                raise
+
+        for index in missing:
+            _component_cache.put(keys[index], results[index])
+
+        # Merge all components in a single pass, edges keep the properties of the input graph
         max_planar_subgraph = Graph()
         remaining_graph = Graph()
-        for component in connected_components:
-            max_planar_subgraph_component, remaining_graph_component = Planarity.max_planar_subgraph_of_connected_graph(component)
-            max_planar_subgraph = Graph.merge_graphs([max_planar_subgraph, max_planar_subgraph_component])
-            remaining_graph = Graph.merge_graphs([remaining_graph, remaining_graph_component])
+        for vertex in graph.get_vertices():
+            max_planar_subgraph.add_vertex(vertex)
+
+        for planar_edges, remaining_edges in results:
+            for vertex1, vertex2 in planar_edges:
+                max_planar_subgraph.add_edge(vertex1, vertex2, graph.get_edge_properties(vertex1, vertex2))
+            for vertex1, vertex2 in remaining_edges:
+                remaining_graph.add_edge(vertex1, vertex2, graph.get_edge_properties(vertex1, vertex2))
 
         return max_planar_subgraph, remaining_graph
 
-    def max_planar_subgraphs(graph) -> list[Graph]:
+    @profiling.timed("max_planar_subgraphs")
+    def max_planar_subgraphs(graph, workers: int = None, progress=None, check=None) -> list[Graph]:
+        # progress, when given, is called with the number of layers found after each one. check is passed on
+        # to max_planar_subgraph.
+        key = _decomposition_key(graph)
+        layers = _decomposition_cache.get(key)
+
+        if layers is None:
+            subgraphs = []
+            graph_copy = Graph.copy(graph)
+            while graph_copy.get_edges_number() > 0:
+                max_planar_subgraph, remaining_graph = Planarity.max_planar_subgraph(graph_copy, workers, check)
+                subgraphs.append(max_planar_subgraph)
+                graph_copy = remaining_graph
+                if progress is not None:
+                    progress(len(subgraphs))
+
+            layers = _store_decomposition(key, subgraphs)
+
+        # Cached layers only hold the structure, edge properties always come from the given graph
         subgraphs = []
-        graph_copy = Graph.copy(graph)
-        while graph_copy.get_edges_number() > 0:
-            max_planar_subgraph, remaining_graph = Planarity.max_planar_subgraph(graph_copy)
-            subgraphs.append(max_planar_subgraph)
-            graph_copy = remaining_graph
+        for vertices, edges in layers:
+            subgraph = Graph()
+            for vertex in vertices:
+                subgraph.add_vertex(vertex)
+            for vertex1, vertex2 in edges:
+                subgraph.add_edge(vertex1, vertex2, graph.get_edge_properties(vertex1, vertex2))
+            subgraphs.append(subgraph)
 
-        return sorted(subgraphs, key=lambda x: x.get_edges_number(), reverse=True)
+        return subgraphs
     
-    def graph_thickness(graph: Graph) -> int:
-        return len(Planarity.max_planar_subgraphs(graph))
+    def thickness_bounds(graph: Graph) -> tuple[int, int]:
+        # The thickness of a graph is the largest one of its components. A planar component with V >= 3 vertices
+        # has at most 3V - 6 edges, and a d-degenerate one splits into d forests (each vertex keeps at most d edges
+        # to the vertices removed after it), so neither bound needs a planarity test.
+        lower, upper = 0, 0
+        for component in Graph.connected_components(graph):
+            vertices_number = component.get_vertices_number()
+            edges_number = sum(1 for vertex1, vertex2 in component.get_edges() if vertex1 != vertex2)
+            if edges_number == 0:
+                continue
+
+            lower = max(lower, -(-edges_number // (3 * vertices_number - 6)) if vertices_number >= 3 else 1)
+            upper = max(upper, min(Graph.degeneracy(component), _complete_graph_thickness(vertices_number)))
+
+        return lower, upper
+
+    @profiling.timed("estimate_thickness")
+    def estimate_thickness(graph: Graph, time_budget: float = None, workers: int = None) -> tuple[int, int]:
+        # Lower and upper bounds on the thickness, refined by peeling maximal planar subgraphs until they meet,
+        # the peeling ends or the time budget (in seconds) runs out. A complete peeling is cached for
+        # max_planar_subgraphs. The budget is checked between layers, so one layer may run past it.
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+        lower, upper = Planarity.thickness_bounds(graph)
+        if lower == upper:
+            return lower, upper
+
+        if lower == 1 and not Planarity.is_planar(graph):
+            lower = 2
+
+        key = _decomposition_key(graph)
+        layers = _decomposition_cache.get(key)
+        if layers is not None:
+            return lower, min(upper, len(layers))
+
+        subgraphs = []
+        remaining_graph = Graph.copy(graph)
+        while lower < upper and remaining_graph.get_edges_number() > 0:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            max_planar_subgraph, remaining_graph = Planarity.max_planar_subgraph(remaining_graph, workers)
+            subgraphs.append(max_planar_subgraph)
+            upper = min(upper, len(subgraphs) + Planarity.thickness_bounds(remaining_graph)[1])
+
+        if len(subgraphs) > 0 and remaining_graph.get_edges_number() == 0:
+            _store_decomposition(key, subgraphs)
+
+        return lower, upper
+
+    def graph_thickness(graph: Graph, time_budget: float = None) -> int:
+        # Smallest number of layers known to be enough
+        return Planarity.estimate_thickness(graph, time_budget)[1]
     
-    def find_layout_of_planar_graph(graph: Graph, node_dimensions: dict, separation: float, drawing_filename: str) -> dict:
+    def layout_cache_stats() -> dict:
+        return _layout_cache.stats()
+
+    @profiling.timed("layout")
+    def find_layout_of_planar_graph(graph: Graph, node_dimensions: dict, separation: float, 
+                                    overhang: float = 0.4) -> tuple[dict, bytes]:
+        key = Planarity._layout_key(graph, node_dimensions, separation, overhang)
+        layout = _layout_cache.get(key)
+
+        if layout is None:
+            layout = Planarity._compute_layout(graph, node_dimensions, separation, overhang)
+            _layout_cache.put(key, layout)
+
+        embedding, drawing = layout
+        return {vertex: dict(position) for vertex, position in embedding.items()}, drawing
+
+    def placement_layer(graphs: list[Graph]) -> int:
+        # The layout of the first peeled layer is the placement: max_planar_subgraph keeps every vertex of the graph
+        # in it, further layers only hold the edges left over and are drawn at this placement. Layers are ordered by
+        # edges, so that layer is found as the one with the most vertices.
+        return max(range(len(graphs)), key=lambda index: graphs[index].get_vertices_number())
+
+    def draw_at_placement(graph: Graph, node_dimensions: dict, placement: dict) -> bytes:
+        # No layout is computed, every vertex is drawn at its position in the placement and edges as straight lines
+        ogdf_graph, reversed_mapping, graph_attributes = Planarity._graph_attributes(graph, node_dimensions)
+        for node in ogdf_graph.nodes:
+            position = placement[reversed_mapping[node.index()]]
+            graph_attributes.x[node] = position['x']
+            graph_attributes.y[node] = position['y']
+
+        return Planarity._draw_svg(graph_attributes)
+
+    def _layout_key(graph: Graph, node_dimensions: dict, separation: float, overhang: float) -> str:
+        digest = hashlib.sha256(Graph.fingerprint(graph).encode())
+        for vertex in sorted(graph.get_vertices()):
+            dimensions = node_dimensions[vertex]
+            digest.update(f"{vertex}\0{dimensions['width']!r}\0{dimensions['height']!r}\0".encode())
+        digest.update(f"{separation!r}\0{overhang!r}".encode())
+
+        return digest.hexdigest()
+
+    def _graph_attributes(graph: Graph, node_dimensions: dict):
         ogdf_graph, mapping = Graph.to_ogdf_graph(graph)
-        reversed_mapping = {node: vertex for vertex, node in mapping.items()}
+        reversed_mapping = {node.index(): vertex for vertex, node in mapping.items()}
 
         graph_attributes = ogdf.GraphAttributes(ogdf_graph, ogdf.GraphAttributes.all)
         
         for node in ogdf_graph.nodes:
-            graph_attributes.width[node] = node_dimensions[reversed_mapping[node]]['width']
-            graph_attributes.height[node] = node_dimensions[reversed_mapping[node]]['height']
+            vertex = reversed_mapping[node.index()]
+            graph_attributes.width[node] = node_dimensions[vertex]['width']
+            graph_attributes.height[node] = node_dimensions[vertex]['height']
             graph_attributes.strokeColor[node] = ogdf.Color.Name.Gold
             graph_attributes.fillColor[node] = ogdf.Color.Name.Gold
             graph_attributes.strokeWidth[node] = 0.2
@@ -93,10 +386,21 @@ class Planarity:
             graph_attributes.strokeColor[edge] = ogdf.Color.Name.Orange
             graph_attributes.strokeWidth[edge] = 0.1
             graph_attributes.arrowType[edge] = getattr(ogdf.EdgeArrow, "None")
+
+        return ogdf_graph, reversed_mapping, graph_attributes
+
+    def _draw_svg(graph_attributes) -> bytes:
+        # Render the SVG into memory instead of a shared file on disk
+        stream = cppyy.gbl.std.ostringstream()
+        ogdf.GraphIO.drawSVG(graph_attributes, stream)
+        return str(stream.str()).encode()
+
+    def _compute_layout(graph: Graph, node_dimensions: dict, separation: float, overhang: float) -> tuple[dict, bytes]:
+        ogdf_graph, reversed_mapping, graph_attributes = Planarity._graph_attributes(graph, node_dimensions)
         
         layouter = ogdf.OrthoLayout()
         layouter.separation(separation)
-        layouter.cOverhang(0.4)
+        layouter.cOverhang(overhang)
         layouter.__python_owns__ = False
 
         planarization = ogdf.PlanarizationLayout()
@@ -105,11 +409,10 @@ class Planarity:
         # planarization = ogdf.SugiyamaLayout()
 
         planarization.call(graph_attributes)
-
-        ogdf.GraphIO.write(graph_attributes, drawing_filename)
+        drawing = Planarity._draw_svg(graph_attributes)
 
         embedding = {}
         for node in ogdf_graph.nodes:
-            embedding[reversed_mapping[node]] = {'x': graph_attributes.x[node], 'y': graph_attributes.y[node]}
+            embedding[reversed_mapping[node.index()]] = {'x': graph_attributes.x[node], 'y': graph_attributes.y[node]}
 
-        return embedding
\ No newline at end of file
+        return embedding, drawing
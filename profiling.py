@@ -0,0 +1,131 @@
+import contextvars
+import cProfile
+import functools
+import io
+import json
+import logging
+import pstats
+import resource
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+logger = logging.getLogger("linkboard.perf")
+
+
+class Recorder:
+    # Per-request aggregate of the stages run while it is active: calls, wall time and peak memory
+    def __init__(self) -> None:
+        self.stages = {}
+
+    def record(self, name: str, seconds: float, peak_memory: int) -> None:
+        stats = self.stages.setdefault(name, {'stage': name, 'calls': 0, 'seconds': 0.0, 'peak_memory': 0})
+        stats['calls'] += 1
+        stats['seconds'] += seconds
+        stats['peak_memory'] = max(stats['peak_memory'], peak_memory)
+
+    def as_rows(self) -> list:
+        return [dict(stats) for stats in self.stages.values()]
+
+
+class ProfileCapture:
+    def __init__(self) -> None:
+        self.stats_text = None
+        self.memory_text = None
+
+
+_recorder = contextvars.ContextVar("linkboard_recorder", default=None)
+_open_stages = contextvars.ContextVar("linkboard_open_stages", default=())
+_profile_lock = threading.Lock()
+
+
+def _max_rss() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@contextmanager
+def collect(recorder: Recorder = None):
+    # Stages run in this context (and in copies of it taken later) are recorded into recorder
+    if recorder is None:
+        recorder = Recorder()
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    # Peak memory is the tracemalloc peak above the allocations at stage start while tracemalloc is tracing,
+    # otherwise the growth of the process' max RSS. Nested stages share the tracemalloc peak, so every open
+    # stage remembers the highest peak seen before an inner stage reset it.
+    tracing = tracemalloc.is_tracing()
+    frame = {'max_peak': 0}
+    parents = _open_stages.get()
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        for parent in parents:
+            parent['max_peak'] = max(parent['max_peak'], peak)
+        tracemalloc.reset_peak()
+        start_memory = current
+    else:
+        start_memory = _max_rss()
+
+    token = _open_stages.set(parents + (frame,))
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        _open_stages.reset(token)
+        if tracing and tracemalloc.is_tracing():
+            peak_memory = max(frame['max_peak'], tracemalloc.get_traced_memory()[1]) - start_memory
+        else:
+            peak_memory = _max_rss() - start_memory
+
+        recorder = _recorder.get()
+        if recorder is not None:
+            recorder.record(name, seconds, peak_memory)
+        logger.info(json.dumps({'event': 'stage', 'stage': name, 'seconds': round(seconds, 6), 'peak_memory': peak_memory}))
+
+
+def timed(name: str):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def capture(enabled: bool = True, top: int = 30):
+    # cProfile + tracemalloc snapshot of a single request. Only one capture can run at a time per process.
+    result = ProfileCapture()
+    if not enabled or not _profile_lock.acquire(blocking=False):
+        yield result
+        return
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        if started_tracing:
+            tracemalloc.stop()
+        _profile_lock.release()
+
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+        result.stats_text = stream.getvalue()
+        result.memory_text = "\n".join(str(statistic) for statistic in snapshot.statistics("lineno")[:top])
+        logger.info(json.dumps({'event': 'profile', 'allocated': sum(statistic.size for statistic in snapshot.statistics("filename"))}))
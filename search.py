@@ -0,0 +1,101 @@
+import bisect
+import re
+import threading
+import weakref
+
+import numpy as np
+
+from pcb_board import PcbBoard
+
+
+PAGE_SIZE = 50
+
+# Separates the searchable strings of an entry and the entries in the joined text, never part of a query
+_SEPARATOR = "\x00"
+_NGRAM = 3
+
+
+class SearchIndex:
+    # Case-insensitive search over named entries, each with a list of member names (pads of a component or a net).
+    # Substring queries intersect trigram postings and verify the few candidates left, shorter queries scan the
+    # joined text in a single regex pass. Prefix queries bisect the sorted names and members.
+    def __init__(self, entries: list) -> None:
+        entries = sorted(entries, key=lambda entry: entry[0])
+        self._names = [name for name, _ in entries]
+        self._members = [list(members) for _, members in entries]
+        self._keys = [_SEPARATOR.join([name] + list(members)).lower() for name, members in entries]
+
+        # Whole text with the start offset of every entry, for queries shorter than a trigram
+        self._text = _SEPARATOR.join(self._keys)
+        self._offsets = np.cumsum([0] + [len(key) + 1 for key in self._keys[:-1]], dtype=np.int64)
+
+        postings = {}
+        for entry_id, key in enumerate(self._keys):
+            for ngram in {key[index:index + _NGRAM] for index in range(len(key) - _NGRAM + 1)}:
+                postings.setdefault(ngram, []).append(entry_id)
+        self._postings = {ngram: np.array(ids, dtype=np.int32) for ngram, ids in postings.items()}
+
+        tokens = sorted((token, entry_id) for entry_id, key in enumerate(self._keys) for token in key.split(_SEPARATOR))
+        self._tokens = [token for token, _ in tokens]
+        self._token_ids = np.array([entry_id for _, entry_id in tokens], dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def search(self, query: str, prefix: bool = False) -> np.ndarray:
+        # Ids of the matching entries in name order
+        query = query.lower().replace(_SEPARATOR, "")
+        if query == "":
+            return np.arange(len(self._names), dtype=np.int32)
+        if prefix:
+            return self._search_prefix(query)
+        if len(query) < _NGRAM:
+            return self._search_text(query)
+        return self._search_ngrams(query)
+
+    def _search_prefix(self, query: str) -> np.ndarray:
+        start = bisect.bisect_left(self._tokens, query)
+        end = bisect.bisect_left(self._tokens, query + "\U0010ffff")
+        return np.unique(self._token_ids[start:end])
+
+    def _search_text(self, query: str) -> np.ndarray:
+        positions = np.fromiter((match.start() for match in re.finditer(re.escape(query), self._text)), dtype=np.int64)
+        return np.unique(np.searchsorted(self._offsets, positions, side='right') - 1).astype(np.int32)
+
+    def _search_ngrams(self, query: str) -> np.ndarray:
+        postings = []
+        for ngram in {query[index:index + _NGRAM] for index in range(len(query) - _NGRAM + 1)}:
+            if ngram not in self._postings:
+                return np.zeros(0, dtype=np.int32)
+            postings.append(self._postings[ngram])
+
+        postings.sort(key=len)
+        candidates = postings[0]
+        for ids in postings[1:]:
+            if len(candidates) == 0:
+                break
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+
+        # Trigrams can match out of order, so the candidates are checked against the query itself
+        if len(query) == _NGRAM:
+            return candidates
+        return np.array([entry_id for entry_id in candidates.tolist() if query in self._keys[entry_id]], dtype=np.int32)
+
+    def page(self, ids: np.ndarray, page: int, page_size: int = PAGE_SIZE) -> list:
+        return [(self._names[entry_id], self._members[entry_id]) for entry_id in ids[page * page_size:(page + 1) * page_size].tolist()]
+
+
+_indexes = weakref.WeakKeyDictionary()
+_indexes_lock = threading.Lock()
+
+
+def board_indexes(board: PcbBoard) -> tuple[SearchIndex, SearchIndex]:
+    # Components and nets indexes, built once per board revision and dropped together with the board
+    with _indexes_lock:
+        revision, indexes = _indexes.get(board, (None, None))
+    if indexes is None or revision != board.get_revision():
+        revision = board.get_revision()
+        indexes = (SearchIndex(board.get_aggregated_pads().items()), SearchIndex(board.get_connections().items()))
+        with _indexes_lock:
+            _indexes[board] = revision, indexes
+    return indexes